@@ -0,0 +1,174 @@
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from BaseClasses import CollectionState
+from .Requires import RequireNode, ItemRequire, ConstantRequire, AndRequire, OrRequire, NotRequire
+
+try:
+    import numpy as np
+    numpy_loaded = True
+except ModuleNotFoundError:
+    numpy_loaded = False
+
+if TYPE_CHECKING:
+    from . import ManualWorld
+
+# rules that would need more AND clauses than this to be written as an OR of ANDs are left to their access_rule
+maximum_clauses_per_rule = 64
+
+class Clause(NamedTuple):
+    atoms: frozenset[int] # item/category counts that must be reached
+    negated_atoms: frozenset[int] # item/category counts that must not be reached
+    unknown: bool # includes a function or a count that depends on the pool, which only the access_rule can check
+
+_always_true = Clause(frozenset(), frozenset(), False)
+_unknown = Clause(frozenset(), frozenset(), True)
+
+class BulkLocationRules:
+    """Evaluate the item counts part of the rules of every location of a player at once, with NumPy.\n
+    Each fixed count of an item or category becomes a row of a sparse item matrix and each rule an OR of AND clauses over those rows,
+    so checking every location is a couple of numpy passes over the player's prog_items.
+    Locations with a function (or an all/half/% count) in a clause that can't be decided from the items alone,
+    and those whose access_rule isn't the one set_rules built anymore (like after add_rule in a hook), are checked with their own access_rule."""
+    def __init__(self, world: "ManualWorld", requires_trees: dict[str, Optional[RequireNode]]):
+        self.world = world
+        self.player = world.player
+        self.location_names = list(requires_trees.keys())
+        self.locations = [world.multiworld.get_location(name, self.player) for name in self.location_names]
+        # the access rules that the requires trees were compiled to, as set_rules set them
+        self.set_rules_access_rules = [world.set_rules_access_rules.get(name) for name in self.location_names]
+
+        self.item_names: list[str] = []
+        self.item_columns: dict[str, int] = {}
+        atom_rows, atom_columns, atom_thresholds = [], [], []
+        atoms: dict[tuple, int] = {}
+
+        def getAtom(item_names: tuple[str, ...], count: int) -> int:
+            key = (item_names, count)
+            if key not in atoms:
+                atoms[key] = len(atom_thresholds)
+                for item_name in item_names:
+                    if item_name not in self.item_columns:
+                        self.item_columns[item_name] = len(self.item_names)
+                        self.item_names.append(item_name)
+                    atom_rows.append(atoms[key])
+                    atom_columns.append(self.item_columns[item_name])
+                atom_thresholds.append(count)
+            return atoms[key]
+
+        def toClauses(node: RequireNode, negated: bool = False) -> Optional[list[Clause]]:
+            if isinstance(node, ConstantRequire):
+                return [_always_true] if node.value != negated else []
+
+            elif isinstance(node, ItemRequire):
+                if not node.count.isdigit():
+                    return [_unknown]
+
+                count = int(node.count)
+                if node.category:
+                    category_items = tuple(sorted(world.item_name_groups.get(node.name, [])))
+                    if not category_items or count == 0:
+                        # same as the evaluator, a category is never enough if it's empty and always is otherwise when 0 are needed
+                        return toClauses(ConstantRequire(bool(category_items) and count == 0), negated)
+                    atom = getAtom(category_items, count)
+                else:
+                    atom = getAtom((node.name,), count)
+
+                if negated:
+                    return [Clause(frozenset(), frozenset([atom]), False)]
+                return [Clause(frozenset([atom]), frozenset(), False)]
+
+            elif isinstance(node, NotRequire):
+                return toClauses(node.child, not negated)
+
+            elif isinstance(node, (AndRequire, OrRequire)):
+                children = [toClauses(child, negated) for child in node.children]
+                if any(child is None for child in children):
+                    return None
+
+                # !(a and b) is (!a or !b), and !(a or b) is (!a and !b)
+                if isinstance(node, OrRequire) != negated:
+                    clauses = [clause for child in children for clause in child]
+                else:
+                    clauses = [_always_true]
+                    for child in children:
+                        clauses = [Clause(left.atoms | right.atoms, left.negated_atoms | right.negated_atoms, left.unknown or right.unknown)
+                                   for left in clauses for right in child]
+                        if len(clauses) > maximum_clauses_per_rule:
+                            return None
+
+                if len(clauses) > maximum_clauses_per_rule:
+                    return None
+                return clauses
+
+            return [_unknown] # functions
+
+        literal_clauses, literal_atoms, literal_negated = [], [], []
+        clause_sizes, clause_unknown, clause_locations = [], [], []
+        always_undecided = []
+
+        for location_index, requires_tree in enumerate(requires_trees.values()):
+            clauses = toClauses(requires_tree) if requires_tree is not None else None
+            always_undecided.append(clauses is None)
+
+            for clause in clauses or []:
+                clause_index = len(clause_sizes)
+                for atom in clause.atoms:
+                    literal_clauses.append(clause_index)
+                    literal_atoms.append(atom)
+                    literal_negated.append(False)
+                for atom in clause.negated_atoms:
+                    literal_clauses.append(clause_index)
+                    literal_atoms.append(atom)
+                    literal_negated.append(True)
+
+                clause_sizes.append(len(clause.atoms) + len(clause.negated_atoms))
+                clause_unknown.append(clause.unknown)
+                clause_locations.append(location_index)
+
+        self.atom_rows = np.array(atom_rows, dtype=np.intp)
+        self.atom_columns = np.array(atom_columns, dtype=np.intp)
+        self.atom_thresholds = np.array(atom_thresholds, dtype=np.int64)
+        self.literal_clauses = np.array(literal_clauses, dtype=np.intp)
+        self.literal_atoms = np.array(literal_atoms, dtype=np.intp)
+        self.literal_negated = np.array(literal_negated, dtype=bool)
+        self.clause_sizes = np.array(clause_sizes, dtype=np.int64)
+        self.clause_unknown = np.array(clause_unknown, dtype=bool)
+        self.clause_locations = np.array(clause_locations, dtype=np.intp)
+        self.always_undecided = np.array(always_undecided, dtype=bool)
+
+    def evaluate(self, state: CollectionState) -> "np.ndarray":
+        """Return a mask of which of self.location_names have their access rule met in this state, not counting whether their region can be reached."""
+        prog_items = state.prog_items[self.player]
+        counts = np.fromiter((prog_items.get(item_name, 0) for item_name in self.item_names), dtype=np.int64, count=len(self.item_names))
+
+        atom_sums = np.bincount(self.atom_rows, weights=counts[self.atom_columns], minlength=len(self.atom_thresholds))
+        atoms_met = atom_sums >= self.atom_thresholds
+        literals_met = atoms_met[self.literal_atoms] != self.literal_negated
+        clauses_met = np.bincount(self.literal_clauses, weights=literals_met, minlength=len(self.clause_sizes)) == self.clause_sizes
+
+        location_count = len(self.location_names)
+        met = np.bincount(self.clause_locations, weights=clauses_met & ~self.clause_unknown, minlength=location_count) > 0
+        undecided = (np.bincount(self.clause_locations, weights=clauses_met & self.clause_unknown, minlength=location_count) > 0) & ~met
+        undecided |= self.always_undecided
+        undecided |= np.fromiter((location.access_rule is not access_rule for location, access_rule in zip(self.locations, self.set_rules_access_rules)),
+                                 dtype=bool, count=location_count)
+
+        # only the rows that the items couldn't decide go through the functions of their access_rule
+        for location_index in np.flatnonzero(undecided):
+            met[location_index] = self.locations[location_index].access_rule(state)
+
+        return met
+
+    def get_results(self, state: CollectionState) -> dict[str, bool]:
+        """Return whether the access rule of each location is met in this state, not counting whether its region can be reached."""
+        return dict(zip(self.location_names, self.evaluate(state).tolist()))
+
+def get_bulk_location_rules(world: "ManualWorld") -> Optional[BulkLocationRules]:
+    """Return the bulk evaluator of the world's location rules, built from what set_rules compiled. None if NumPy isn't installed."""
+    if not numpy_loaded:
+        return None
+
+    if not hasattr(world, 'bulk_location_rules'):
+        world.bulk_location_rules = BulkLocationRules(world, world.location_requires_trees)
+
+    return world.bulk_location_rules
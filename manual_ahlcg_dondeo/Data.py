@@ -1,7 +1,8 @@
 import logging
+import sys
 
-from .DataValidation import DataValidation, ValidationError
-from .Helpers import load_data_file as helpers_load_data_file
+from .DataValidation import DataValidation, data_load_validations, runDataValidations
+from .Helpers import load_data_file as helpers_load_data_file, load_data_table_csv, get_data_hash
 
 from .hooks.Data import \
     after_load_game_file, \
@@ -35,10 +36,19 @@ class ManualFile:
 
         return contents
 
+def load_list_table(name: str) -> list:
+    """Load the rows of data/{name}.json, followed by those of data/{name}.csv and data/{name}.tsv when those exist."""
+    table = convert_to_list(ManualFile(f'{name}.json', list).load(), 'data')
+
+    for extension in ["csv", "tsv"]:
+        table += load_data_table_csv(f'{name}.{extension}')
+
+    return table
+
 
 game_table = ManualFile('game.json', dict).load() #dict
-item_table = convert_to_list(ManualFile('items.json', list).load(), 'data') #list
-location_table = convert_to_list(ManualFile('locations.json', list).load(), 'data') #list
+item_table = load_list_table('items') #list
+location_table = load_list_table('locations') #list
 region_table = ManualFile('regions.json', dict).load() #dict
 category_table = ManualFile('categories.json', dict).load() #dict
 option_table = ManualFile('options.json', dict).load() #dict
@@ -57,30 +67,28 @@ category_table = after_load_category_file(category_table)
 option_table = after_load_option_file(option_table)
 meta_table = after_load_meta_file(meta_table)
 
+# fingerprint of the data as the hooks left it, what gets compiled from it (see Rules.py) can be reused for the same fingerprint
+data_fingerprint = get_data_hash([game_table, item_table, location_table, region_table, category_table, option_table, meta_table])
+
 # seed all of the tables for validation
 DataValidation.game_table = game_table
 DataValidation.item_table = item_table
 DataValidation.location_table = location_table
 DataValidation.region_table = region_table
 
-validation_errors = []
-
 # check that json files are not just invalid json
-try: DataValidation.checkForGameBeingInvalidJSON()
-except ValidationError as e: validation_errors.append(e)
-
-try: DataValidation.checkForItemsBeingInvalidJSON()
-except ValidationError as e: validation_errors.append(e)
-
-try: DataValidation.checkForLocationsBeingInvalidJSON()
-except ValidationError as e: validation_errors.append(e)
+validation_errors = [e for e in runDataValidations(data_load_validations).values() if e is not None]
 
 
 ############
 # If there are any validation errors, display all of them at once
 ############
 
-if len(validation_errors) > 0:
+# Watch.py validates the data itself and keeps running while it's invalid, so it must not be stopped by the prompt below.
+# `python -m <this package>.Watch` imports this package (and so this file) before Watch.py runs, which is why it's found from the command line.
+watching_data = f"{__package__}.Watch" in getattr(sys, "orig_argv", sys.argv)
+
+if len(validation_errors) > 0 and not watching_data:
     logging.error("\nValidationError(s): \n\n%s\n\n" % ("\n".join([' - ' + str(validation_error) for validation_error in validation_errors])))
     print("\n\nYou can close this window.\n")
     keeping_terminal_open = input("If you are running from a terminal, press Ctrl-C followed by ENTER to break execution.")
@@ -1,8 +1,10 @@
-import logging
-import re
 import json
+import logging
+from typing import Callable, Optional
 from worlds.AutoWorld import World
-from BaseClasses import MultiWorld, ItemClassification
+from BaseClasses import MultiWorld, CollectionState
+
+from .Requires import get_item_requires, get_function_requires, normalize_dict_requires
 
 
 class ValidationError(Exception):
@@ -14,80 +16,76 @@ class DataValidation():
     location_table = []
     region_table = {}
 
+    # lookups built from the tables above by buildLookups()
+    item_names: set[str] = set()
+    item_categories: set[str] = set()
+    region_names: set[str] = set()
 
     @staticmethod
-    def checkItemNamesInLocationRequires():
-        for location in DataValidation.location_table:
-            if "requires" not in location:
-                continue
-
-            if isinstance(location["requires"], str):
-                # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', location["requires"]):
-                    if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
-                        continue
-                    else:
-                        # if it's a category, validate that the category exists
-                        if '@' in item:
-                            item = item.replace("|", "")
-                            item_parts = item.split(":")
-                            item_name = item
+    def buildLookups():
+        """Precompute the sets of item names, item categories and region names used by the checks below,
+        so every name lookup is a set membership test instead of a scan of the whole table."""
+        DataValidation.buildItemLookups()
+        DataValidation.buildRegionLookups()
 
-                            if len(item_parts) > 1:
-                                item_name = item_parts[0]
-
-                            item_name = item_name[1:]
-                            item_category_exists = len([item for item in DataValidation.item_table if item_name in item.get('category', [])]) > 0
-
-                            if not item_category_exists:
-                                raise ValidationError("Item category %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
-
-                            continue
-
-                        item = item.replace("|", "")
-
-                        item_parts = item.split(":")
-                        item_name = item
+    @staticmethod
+    def buildItemLookups():
+        DataValidation.item_names = set()
+        DataValidation.item_categories = set()
 
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
+        for item in DataValidation.item_table:
+            DataValidation.item_names.add(item["name"])
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+            categories = item.get("category", [])
+            if isinstance(categories, str):
+                categories = [categories]
+            DataValidation.item_categories.update(categories)
 
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
+    @staticmethod
+    def buildRegionLookups():
+        DataValidation.region_names = set(DataValidation.region_table.keys())
 
-            else:  # item access is in dict form
-                for item in location["requires"]:
-                    # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-                    if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                        or_items = item
+    @staticmethod
+    def _getRequiresItemTokens(requires) -> list[tuple[bool, str]]:
+        """Tokenize a requires (string or dict form) once and return every item/category it references
+        as a list of (is_category, name) tuples."""
+        tokens = []
+
+        if isinstance(requires, str):
+            for item in get_item_requires(requires):
+                if item.name.lower() in ["or", "and", "(", ")"]:
+                    continue
 
-                        if isinstance(item, dict):
-                            or_items = item["or"]
+                tokens.append((item.category, item.name))
 
-                        for or_item in or_items:
-                            or_item_parts = or_item.split(":")
-                            or_item_name = or_item
+        else:  # item access is in dict form
+            try:
+                dict_requires = normalize_dict_requires(requires)
+            except ValueError as e:
+                raise ValidationError(str(e))
 
-                            if len(or_item_parts) > 1:
-                                or_item_name = or_item_parts[0]
+            for item_name, _ in dict_requires.items + tuple(item for or_items in dict_requires.or_groups for item in or_items):
+                tokens.append((False, item_name))
 
-                            item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
+        return tokens
 
-                            if not item_exists:
-                                raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (or_item_name, location["name"]))
-                    else:
-                        item_parts = item.split(":")
-                        item_name = item
+    @staticmethod
+    def _checkItemNamesInRequires(requires, area_type: str, area_name: str):
+        for is_category, item_name in DataValidation._getRequiresItemTokens(requires):
+            if is_category:
+                if item_name not in DataValidation.item_categories:
+                    raise ValidationError("Item category %s is required by %s %s but is misspelled or does not exist." % (item_name, area_type, area_name))
 
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
+            elif item_name not in DataValidation.item_names:
+                raise ValidationError("Item %s is required by %s %s but is misspelled or does not exist." % (item_name, area_type, area_name))
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+    @staticmethod
+    def checkItemNamesInLocationRequires():
+        for location in DataValidation.location_table:
+            if "requires" not in location:
+                continue
 
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
+            DataValidation._checkItemNamesInRequires(location["requires"], "location", location["name"])
 
     @staticmethod
     def checkItemNamesInRegionRequires():
@@ -97,73 +95,7 @@ class DataValidation():
             if "requires" not in region:
                 continue
 
-            if isinstance(region["requires"], str):
-                # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', region["requires"]):
-                    if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
-                        continue
-                    else:
-                        # if it's a category, validate that the category exists
-                        if '@' in item:
-                            item = item.replace("|", "")
-                            item_parts = item.split(":")
-                            item_name = item
-
-                            if len(item_parts) > 1:
-                                item_name = item_parts[0]
-
-                            item_name = item_name[1:]
-                            item_category_exists = len([item for item in DataValidation.item_table if item_name in item.get('category', [])]) > 0
-
-                            if not item_category_exists:
-                                raise ValidationError("Item category %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
-
-                            continue
-
-                        item = item.replace("|", "")
-
-                        item_parts = item.split(":")
-                        item_name = item
-
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
-
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
-
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
-
-            else:  # item access is in dict form
-                for item in region["requires"]:
-                    # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-                    if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                        or_items = item
-
-                        if isinstance(item, dict):
-                            or_items = item["or"]
-
-                        for or_item in or_items:
-                            or_item_parts = or_item.split(":")
-                            or_item_name = or_item
-
-                            if len(or_item_parts) > 1:
-                                or_item_name = or_item_parts[0]
-
-                            item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
-
-                            if not item_exists:
-                                raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (or_item_name, region_name))
-                    else:
-                        item_parts = item.split(":")
-                        item_name = item
-
-                        if len(item_parts) > 1:
-                            item_name = item_parts[0]
-
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
-
-                        if not item_exists:
-                            raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
+            DataValidation._checkItemNamesInRequires(region["requires"], "region", region_name)
 
     @staticmethod
     def checkRegionNamesInLocations():
@@ -171,13 +103,43 @@ class DataValidation():
             if "region" not in location or location["region"] in ["Menu", "Manual"]:
                 continue
 
-            region_exists = len([name for name in DataValidation.region_table if name == location["region"]]) > 0
-
-            if not region_exists:
+            if location["region"] not in DataValidation.region_names:
                 raise ValidationError("Region %s is set for location %s, but the region is misspelled or does not exist." % (location["region"], location["name"]))
 
     @staticmethod
     def checkItemsThatShouldBeRequired():
+        # collect, in a single pass over every requires, the first location and region requiring each item name.
+        # An item written as |Item| in a requires (including in function args) has to be progression, like it always had to,
+        # while one only required with a count (|Item:2|) or in dict form is only warned about.
+        required_by_location = {}
+        required_by_region = {}
+        counted_by_location = {}
+        counted_by_region = {}
+
+        def collectRequiredItems(requires, area_name: str, required: dict[str, str], counted: dict[str, str]):
+            requires_text = json.dumps(requires)
+            for is_category, item_name in DataValidation._getRequiresItemTokens(requires):
+                if is_category:
+                    continue
+                if '|{}|'.format(item_name) in requires_text:
+                    required.setdefault(item_name, area_name)
+                else:
+                    counted.setdefault(item_name, area_name)
+
+        for location in DataValidation.location_table:
+            if "requires" not in location:
+                continue
+
+            collectRequiredItems(location["requires"], location["name"], required_by_location, counted_by_location)
+
+        for region_name in DataValidation.region_table:
+            region = DataValidation.region_table[region_name]
+
+            if "requires" not in region:
+                continue
+
+            collectRequiredItems(region["requires"], region_name, required_by_region, counted_by_region)
+
         for item in DataValidation.item_table:
             # if the item is already progression, no need to check
             if "progression" in item and item["progression"]:
@@ -187,46 +149,27 @@ class DataValidation():
             if "progression_skip_balancing" in item and item["progression_skip_balancing"]:
                 continue
 
-            # check location requires for the presence of item name
-            for location in DataValidation.location_table:
-                if "requires" not in location:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                location_requires = json.dumps(location["requires"])
+            if item["name"] in required_by_location:
+                raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], required_by_location[item["name"]]))
 
-                # if boolean, else legacy
-                if isinstance(location_requires, str):
-                    if '|{}|'.format(item["name"]) in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
-                else:
-                    if item["name"] in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
+            if item["name"] in required_by_region:
+                raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], required_by_region[item["name"]]))
 
-            # check region requires for the presence of item name
-            for region_name in DataValidation.region_table:
-                region = DataValidation.region_table[region_name]
-
-                if "requires" not in region:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                region_requires = json.dumps(region["requires"])
-
-                # if boolean, else legacy
-                if isinstance(region_requires, str):
-                    if '|{}|'.format(item["name"]) in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
-                else:
-                    if item["name"] in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
+            if item["name"] in counted_by_location:
+                logging.warning("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], counted_by_location[item["name"]]))
+            elif item["name"] in counted_by_region:
+                logging.warning("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], counted_by_region[item["name"]]))
 
     @staticmethod
-    def _checkLocationRequiresForItemValueWithRegex(values_requested: dict[str, int], requires) -> dict[str, int]:
+    def _checkRequiresForItemValue(values_requested: dict[str, int], requires) -> dict[str, int]:
         if isinstance(requires, str) and 'ItemValue' in requires:
-            for result in re.findall(r'\{ItemValue\(([^:]*)\:(.*?)\)\}', requires):
-                value = result[0].lower().strip()
-                count = int(result[1].split(",")[0])
+            for function in get_function_requires(requires):
+                if function.name != "ItemValue" or ":" not in function.args:
+                    continue
+
+                value, count = function.args.split(":", 1)
+                value = value.lower().strip()
+                count = int(count.split(",")[0])
                 if not values_requested.get(value):
                     values_requested[value] = count
                 else:
@@ -236,58 +179,87 @@ class DataValidation():
 
     @staticmethod
     def preFillCheckIfEnoughItemsForValue(world: World, multiworld: MultiWorld):
-        from .Helpers import get_items_with_value, get_items_for_player, filter_used_regions
+        from .Helpers import get_items_with_value, get_used_regions
         player = world.player
         values_requested = {}
-        player_regions = []
 
-        #Grab all the player's regions
-        for region in multiworld.regions:
-            if region.player != player:
-                continue
-            player_regions.append(region)
-
-        used_regions = filter_used_regions(player_regions)
-        used_regions_names = {r.name for r in set(used_regions)}
+        used_regions = get_used_regions(world, multiworld, player)
+        used_regions_names = {r.name for r in used_regions}
 
         #Check used regions (and their parent(s)) for ItemValue requirement
         for region in used_regions:
             manualregion = DataValidation.region_table.get(region.name, {})
             if manualregion:
                 if manualregion.get("requires"):
-                    DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(manualregion["requires"]))
+                    DataValidation._checkRequiresForItemValue(values_requested, manualregion["requires"])
 
                 for region_entrance, require in manualregion.get('entrance_requires', {}).items():
                     if region_entrance in used_regions_names:
-                        DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(require))
+                        DataValidation._checkRequiresForItemValue(values_requested, require)
 
                 for region_exit, require in manualregion.get('exit_requires', {}).items():
                     if region_exit in used_regions_names:
-                        DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(require))
+                        DataValidation._checkRequiresForItemValue(values_requested, require)
 
             for location in region.locations:
                 manualLocation = world.location_name_to_location.get(location.name, {})
                 if "requires" in manualLocation and manualLocation["requires"]:
-                    DataValidation._checkLocationRequiresForItemValueWithRegex(values_requested, json.dumps(manualLocation["requires"]))
+                    DataValidation._checkRequiresForItemValue(values_requested, manualLocation["requires"])
 
         # compare whats available vs requested but only if there's anything requested
         if values_requested:
             errors = []
-            existing_items = [item for item in get_items_for_player(multiworld, player, True) if
-                              item.code is not None and ItemClassification.progression in item.classification]
+            progression_counts = world.get_item_counts(player, only_progression=True)
             for value, val_count in values_requested.items():
                 items_value = get_items_with_value(world, multiworld, value, player)
                 found_count = 0
                 if items_value:
-                    for item in existing_items:
-                        if item.name in items_value:
-                            found_count += items_value[item.name]
+                    for item_name, item_value in items_value.items():
+                        found_count += item_value * progression_counts.get(item_name, 0)
 
                 if found_count < val_count:
                     errors.append(f"   '{value}': {found_count} out of the {val_count} {value} worth of progression items required can be found.")
             if errors:
                 raise ValidationError("There are not enough progression items for the following value(s): \n" + "\n".join(errors))
 
+    @staticmethod
+    def preFillCheckIfGoalCanBeReached(world: World, multiworld: MultiWorld):
+        from .Rules import IncrementalReachability
+        player = world.player
+
+        # the items of a player in an item link are in the pool of the link's group
+        if any(player in group["players"] for group in multiworld.groups.values()):
+            return
+
+        state = CollectionState(multiworld)
+        for item in multiworld.itempool:
+            if item.player == player and item.advancement:
+                state.collect(item, True)
+
+        # items already placed (like the victory item or place_item) are collected when their location is reached,
+        # except for those placed in other worlds which are counted as found
+        locked_items = {}
+        for location in multiworld.get_filled_locations():
+            if location.item.player != player or not location.item.advancement:
+                continue
+            if location.player == player:
+                locked_items[location.name] = location.item
+            else:
+                state.collect(location.item, True)
+
+        reachability = IncrementalReachability(world, state)
+        reachability.sweep(locked_items)
+
+        reachable_locations = {location.name for location in multiworld.get_reachable_locations(state, player)}
+        if reachability.reachable_locations != reachable_locations:
+            logging.warning(f"The reachable locations of {world.game} for player {multiworld.get_player_name(player)} found incrementally don't match the ones found by Archipelago, "
+                            f"the goal check is skipped.\n   Only found incrementally: {sorted(reachability.reachable_locations - reachable_locations)}"
+                            f"\n   Only found by Archipelago: {sorted(reachable_locations - reachability.reachable_locations)}")
+            return
+
+        if not multiworld.completion_condition[player](state):
+            raise ValidationError("The goal cannot be reached even with every progression item of the pool. Check the requires of the victory location and of the regions leading to it.")
+
     @staticmethod
     def checkRegionsConnectingToOtherRegions():
         for region_name in DataValidation.region_table:
@@ -297,35 +269,33 @@ class DataValidation():
                 continue
 
             for connecting_region in region["connects_to"]:
-                region_exists = len([name for name in DataValidation.region_table if name == connecting_region]) > 0
-
-                if not region_exists:
+                if connecting_region not in DataValidation.region_names:
                     raise ValidationError("Region %s connects to a region %s, which is misspelled or does not exist." % (region_name, connecting_region))
 
     @staticmethod
     def checkForDuplicateItemNames():
-        for item in DataValidation.item_table:
-            name_count = len([i for i in DataValidation.item_table if i["name"] == item["name"]])
+        seen_names = set()
 
-            if name_count > 1:
+        for item in DataValidation.item_table:
+            if item["name"] in seen_names:
                 raise ValidationError("Item %s is defined more than once." % (item["name"]))
 
+            seen_names.add(item["name"])
+
     @staticmethod
     def checkForDuplicateLocationNames():
-        for location in DataValidation.location_table:
-            name_count = len([l for l in DataValidation.location_table if l["name"] == location["name"]])
+        seen_names = set()
 
-            if name_count > 1:
+        for location in DataValidation.location_table:
+            if location["name"] in seen_names:
                 raise ValidationError("Location %s is defined more than once." % (location["name"]))
 
+            seen_names.add(location["name"])
+
     @staticmethod
     def checkForDuplicateRegionNames():
         # this currently does nothing because the region name is a dict key, which will never be non-unique / limited to 1
-        for region_name in DataValidation.region_table:
-            name_count = len([r for r in DataValidation.region_table if r == region_name])
-
-            if name_count > 1:
-                raise ValidationError("Region %s is defined more than once." % (region_name))
+        pass
 
     @staticmethod
     def checkStartingItemsForValidItemsAndCategories():
@@ -340,12 +310,12 @@ class DataValidation():
 
             if "items" in starting_block:
                 for item_name in starting_block["items"]:
-                    if not item_name in [item["name"] for item in DataValidation.item_table]:
+                    if item_name not in DataValidation.item_names:
                         raise ValidationError("Item %s is set as a starting item, but is misspelled or is not defined." % (item_name))
 
             if "item_categories" in starting_block:
                 for category_name in starting_block["item_categories"]:
-                    if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                    if category_name not in DataValidation.item_categories:
                         raise ValidationError("Item category %s is set as a starting item category, but is misspelled or is not defined on any items." % (category_name))
 
     @staticmethod
@@ -389,7 +359,7 @@ class DataValidation():
                 continue
 
             for item_name in place_item:
-                if not item_name in [item["name"] for item in DataValidation.item_table]:
+                if item_name not in DataValidation.item_names:
                     raise ValidationError("Item %s is placed (using place_item) on a location, but is misspelled or is not defined." % (item_name))
 
     @staticmethod
@@ -403,7 +373,7 @@ class DataValidation():
                 continue
 
             for category_name in place_item_category:
-                if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                if category_name not in DataValidation.item_categories:
                     raise ValidationError("Item category %s is placed (using place_item_category) on a location, but is misspelled or is not defined." % (category_name))
 
     @staticmethod
@@ -428,12 +398,14 @@ class DataValidation():
         if not using_starting_regions:
             return
 
+        connected_regions = set()
+        for region in DataValidation.region_table.values():
+            connected_regions.update(region.get("connects_to") or [])
+
         nonstarting_regions = [region for region in DataValidation.region_table if not DataValidation.region_table[region].get("starting")]
 
         for nonstarter in nonstarting_regions:
-            regions_that_connect_to = [region for region in DataValidation.region_table if "connects_to" in DataValidation.region_table[region] and nonstarter in DataValidation.region_table[region]["connects_to"]]
-
-            if len(regions_that_connect_to) == 0:
+            if nonstarter not in connected_regions:
                 raise ValidationError("The region '%s' is set as a non-starting region, but has no regions that connect to it. It will be inaccessible." % nonstarter)
 
 
@@ -444,66 +416,85 @@ def runPreFillDataValidation(world: World, multiworld: MultiWorld):
     try: DataValidation.preFillCheckIfEnoughItemsForValue(world, multiworld)
     except ValidationError as e: validation_errors.append(e)
 
+    # check that the goal can be reached with the items of the pool, only when enabled in meta.json since it sweeps the player's whole world
+    from .Meta import check_goal_reachable
+    if check_goal_reachable:
+        try: DataValidation.preFillCheckIfGoalCanBeReached(world, multiworld)
+        except ValidationError as e: validation_errors.append(e)
+
     if validation_errors:
         heading = f"ValidationError(s) for pre_fill of {world.game}:";
         newline = "\n"
         raise Exception(f"\n\n{heading} \n\n{newline.join([' - ' + str(validation_error) for validation_error in validation_errors])}\n\n")
 
-# Called during stage_assert_generate
-def runGenerationDataValidation(cls) -> None:
-    validation_errors = []
+# Checks that can run as soon as the data files are loaded, with the tables each one reads
+data_load_validations: list[tuple[Callable[[], None], set[str]]] = [
+    # check that json files are not just invalid json
+    (DataValidation.checkForGameBeingInvalidJSON, {"game"}),
+    (DataValidation.checkForItemsBeingInvalidJSON, {"items"}),
+    (DataValidation.checkForLocationsBeingInvalidJSON, {"locations"}),
+]
 
+# Checks run during stage_assert_generate, with the tables each one reads
+generation_validations: list[tuple[Callable[[], None], set[str]]] = [
     # check that requires have correct item names in locations and regions
-    try: DataValidation.checkItemNamesInLocationRequires()
-    except ValidationError as e: validation_errors.append(e)
-
-    try: DataValidation.checkItemNamesInRegionRequires()
-    except ValidationError as e: validation_errors.append(e)
+    (DataValidation.checkItemNamesInLocationRequires, {"items", "locations"}),
+    (DataValidation.checkItemNamesInRegionRequires, {"items", "regions"}),
 
     # check that region names are correct in locations
-    try: DataValidation.checkRegionNamesInLocations()
-    except ValidationError as e: validation_errors.append(e)
+    (DataValidation.checkRegionNamesInLocations, {"locations", "regions"}),
 
     # check that items that are required by locations and regions are also marked required
-    try: DataValidation.checkItemsThatShouldBeRequired()
-    except ValidationError as e: validation_errors.append(e)
+    (DataValidation.checkItemsThatShouldBeRequired, {"items", "locations", "regions"}),
 
     # check that regions that are connected to are correct
-    try: DataValidation.checkRegionsConnectingToOtherRegions()
-    except ValidationError as e: validation_errors.append(e)
+    (DataValidation.checkRegionsConnectingToOtherRegions, {"regions"}),
 
     # check for duplicate names in items, locations, and regions
-    try: DataValidation.checkForDuplicateItemNames()
-    except ValidationError as e: validation_errors.append(e)
-
-    try: DataValidation.checkForDuplicateLocationNames()
-    except ValidationError as e: validation_errors.append(e)
-
-    try: DataValidation.checkForDuplicateRegionNames()
-    except ValidationError as e: validation_errors.append(e)
+    (DataValidation.checkForDuplicateItemNames, {"items"}),
+    (DataValidation.checkForDuplicateLocationNames, {"locations"}),
+    (DataValidation.checkForDuplicateRegionNames, {"regions"}),
 
     # check that starting items are actually valid starting item definitions
-    try: DataValidation.checkStartingItemsForBadSyntax()
-    except ValidationError as e: validation_errors.append(e)
+    (DataValidation.checkStartingItemsForBadSyntax, {"game"}),
 
     # check that starting items and starting item categories actually exist in the items json
-    try: DataValidation.checkStartingItemsForValidItemsAndCategories()
-    except ValidationError as e: validation_errors.append(e)
+    (DataValidation.checkStartingItemsForValidItemsAndCategories, {"game", "items"}),
 
     # check that placed items are actually valid place item definitions
-    try: DataValidation.checkPlacedItemsAndCategoriesForBadSyntax()
-    except ValidationError as e: validation_errors.append(e)
+    (DataValidation.checkPlacedItemsAndCategoriesForBadSyntax, {"locations"}),
 
     # check placed item and item categories for valid options for each
-    try: DataValidation.checkPlacedItemsForValidItems()
-    except ValidationError as e: validation_errors.append(e)
-
-    try: DataValidation.checkPlacedItemCategoriesForValidItemCategories()
-    except ValidationError as e: validation_errors.append(e)
+    (DataValidation.checkPlacedItemsForValidItems, {"locations", "items"}),
+    (DataValidation.checkPlacedItemCategoriesForValidItemCategories, {"locations", "items"}),
 
     # check for regions that are set as non-starting regions and have no connectors to them (so are unreachable)
-    try: DataValidation.checkForNonStartingRegionsThatAreUnreachable()
-    except ValidationError as e: validation_errors.append(e)
+    (DataValidation.checkForNonStartingRegionsThatAreUnreachable, {"regions"}),
+]
+
+def runDataValidations(validations: list[tuple[Callable[[], None], set[str]]], changed_tables: Optional[set[str]] = None) -> dict[Callable[[], None], Optional[ValidationError]]:
+    """Run the given checks and return the result of each one, None meaning it passed.\n
+    If changed_tables is passed, only the checks that read at least one of those tables are run."""
+    results = {}
+
+    for check, tables in validations:
+        if changed_tables is not None and not tables.intersection(changed_tables):
+            continue
+
+        try:
+            check()
+            results[check] = None
+        except ValidationError as e:
+            results[check] = e
+
+    return results
+
+# Called during stage_assert_generate
+def runGenerationDataValidation(cls) -> None:
+    # build the name lookups every check below relies on
+    DataValidation.buildLookups()
+
+    validation_errors = [e for e in runDataValidations(generation_validations).values() if e is not None]
 
     if len(validation_errors) > 0:
         heading = f"ValidationError(s) in {cls.game}:";
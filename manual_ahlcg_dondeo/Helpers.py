@@ -1,12 +1,15 @@
 import ast
 import csv
+import hashlib
+import inspect
+import io
 import os
 import pkgutil
 import json
 
-from BaseClasses import MultiWorld, Item
+from BaseClasses import MultiWorld, Item, CollectionState
 from enum import IntEnum
-from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any
+from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any, Callable, Iterable, NamedTuple
 from types import GenericAlias
 from worlds.AutoWorld import World
 from .hooks.Helpers import before_is_category_enabled, before_is_item_enabled, before_is_location_enabled
@@ -37,6 +40,79 @@ def load_data_csv(*args) -> list[dict]:
 
     return filedata
 
+# How the columns of an items/locations csv or tsv file get converted, any other column is kept as text
+csv_list_separator = ";"
+csv_column_types = {
+    "id": int,
+    "count": int,
+    "category": list,
+    "place_item": list,
+    "place_item_category": list,
+    "dont_place_item": list,
+    "dont_place_item_category": list,
+    "value": dict,
+    "progression": bool,
+    "progression_skip_balancing": bool,
+    "useful": bool,
+    "trap": bool,
+    "filler": bool,
+    "local": bool,
+    "victory": bool,
+    "prehint": bool,
+    "early": int|bool,
+    "local_early": int|bool,
+}
+
+def load_data_table_csv(*args) -> list[dict]:
+    """Load an items or locations table from a csv (comma separated) or tsv (tab separated) file in the data folder.\n
+    The first row holds the column names, which are the same as the properties of items.json/locations.json.
+    Empty cells are left out, lists like category are separated by ; and value is written like 'coins:2;gems:1'.\n
+    eg.\n
+    name,category,count,progression\n
+    Roland Banks,Investigators;Guardian Level 0;Seeker Level 0,1,true
+    """
+    fname = "/".join(["data", *args])
+
+    try:
+        text = pkgutil.get_data(__name__, fname).decode()
+    except:
+        return []
+
+    delimiter = "\t" if fname.endswith(".tsv") else ","
+    return [convert_csv_row(row, fname) for row in csv.DictReader(io.StringIO(text), delimiter=delimiter)]
+
+def convert_csv_row(row: dict[str, str], fname: str) -> dict[str, Any]:
+    """Convert a row of a csv/tsv data table to the same dict its json equivalent would be."""
+    converted = {}
+
+    for column, cell in row.items():
+        if column is None or cell is None:
+            continue # cells past the header's last column or missing at the end of the row
+
+        column = column.strip()
+        cell = cell.strip()
+        if not column or cell == "":
+            continue
+
+        column_type = csv_column_types.get(column, str)
+        try:
+            if column_type is list:
+                converted[column] = [part.strip() for part in cell.split(csv_list_separator) if part.strip()]
+            elif column_type is dict:
+                converted[column] = {}
+                for part in cell.split(csv_list_separator):
+                    if part.strip():
+                        key, amount = part.split(":")
+                        converted[column][key.strip()] = int(amount)
+            elif column_type is str:
+                converted[column] = cell
+            else:
+                converted[column] = convert_string_to_type(cell, column_type)
+        except Exception as ex:
+            raise ValueError(f"The value '{cell}' in the '{column}' column of {fname} is invalid for the row of '{row.get('name')}'.\n{type(ex).__name__}: {ex}")
+
+    return converted
+
 def is_option_enabled(multiworld: MultiWorld, player: int, name: str) -> bool:
     return get_option_value(multiworld, player, name) > 0
 
@@ -133,12 +209,50 @@ def get_items_for_player(multiworld: MultiWorld, player: int, includePrecollecte
 def reset_specific_item_value_cache_for_player(world: World, value: str, player: Optional[int] = None) -> dict[str, int]:
     if player is None:
         player = world.player
-    return world.item_values[player].pop(value, {})
+    # the whole index is built at once, so it is rebuilt with the value the next time it's needed
+    items_with_value = get_item_value_index(world, player).get(value.lower().strip(), {})
+    reset_item_value_cache_for_player(world, player)
+    return items_with_value
 
 def reset_item_value_cache_for_player(world: World, player: Optional[int] = None):
     if player is None:
         player = world.player
-    world.item_values[player] = {}
+    if hasattr(world, 'item_value_index'):
+        world.item_value_index.pop(player, None)
+
+def get_item_value_index(world: World, player: Optional[int] = None) -> dict[str, dict[str, int]]:
+    """Return the player's item value index in the format 'value name': {'Item Name': 'value count'}\n
+    It is built from the items of the player's pool (see world.get_item_counts) and their precollected items,
+    the same items as get_items_with_value with skipCache, and is built again when those items change,
+    like when a hook changes world.item_counts or precollects an item after create_items.\n
+    Before create_items the player has no item counts yet, an empty index is returned and it isn't cached.
+    """
+    if player is None:
+        player = world.player
+
+    item_counts = world.get_item_counts(player)
+    if not item_counts:
+        return {}
+
+    item_names = set(item_counts)
+    item_names.update(item.name for item in world.multiworld.precollected_items.get(player, []))
+    if player in getattr(world, 'item_value_index', {}) and world.item_value_index_names[player] == item_names:
+        return world.item_value_index[player]
+
+    value_index: dict[str, dict[str, int]] = {}
+    for item_name in item_names:
+        manual_item = world.item_name_to_item.get(item_name)
+        if manual_item is None or manual_item.id is None or not manual_item.value:
+            continue
+        for value, count in manual_item.value.items():
+            value_index.setdefault(value, {})[item_name] = count
+
+    if not hasattr(world, 'item_value_index'): #Cache of just the item values
+        world.item_value_index = {}
+        world.item_value_index_names = {} # the names of the items each index was built from
+    world.item_value_index[player] = value_index
+    world.item_value_index_names[player] = item_names
+    return value_index
 
 def get_items_with_value(world: World, multiworld: MultiWorld, value: str, player: Optional[int] = None, skipCache: bool = False) -> dict[str, int]:
     """Return a dict of every items with a specific value type present in their respective 'value' dict\n
@@ -149,59 +263,123 @@ def get_items_with_value(world: World, multiworld: MultiWorld, value: str, playe
     if player is None:
         player = world.player
 
-    player_items = get_items_for_player(multiworld, player, True)
-    # Just a small check to prevent caching {} if items don't exist yet
-    if not player_items:
-        return {value: -1}
-
     value = value.lower().strip()
 
-    if not skipCache:
-        if not hasattr(world, 'item_values'): #Cache of just the item values
-            world.item_values = {}
+    if skipCache:
+        player_items = get_items_for_player(multiworld, player, True)
+        # Just a small check to prevent returning {} if items don't exist yet
+        if not player_items:
+            return {value: -1}
+
+        return {i.name: world.item_name_to_item[i.name]['value'].get(value, 0)
+                for i in player_items if i.code is not None
+                and i.name in world.item_name_groups.get(f'has_{value}_value', [])}
 
-        if not world.item_values.get(player):
-            world.item_values[player] = {}
+    # Just a small check to prevent caching {} if items don't exist yet
+    if not world.get_item_counts(player):
+        return {value: -1}
 
-    if value not in world.item_values.get(player, {}).keys() or skipCache:
-        item_with_values = {i.name: world.item_name_to_item[i.name]['value'].get(value, 0)
-                            for i in player_items if i.code is not None
-                            and i.name in world.item_name_groups.get(f'has_{value}_value', [])}
-        if skipCache:
-            return item_with_values
-        world.item_values[player][value] = item_with_values
-    return world.item_values[player].get(value)
+    return get_item_value_index(world, player).setdefault(value, {})
 
 
 def filter_used_regions(player_regions: dict|list) -> set:
     """Return a set of regions that are actually used in Generation. It includes region that have no locations but are required by other regions\n
     The dict version of the player_regions must be in the format: dict(region name str: region)
     """
-    used_regions = set()
-
     if isinstance(player_regions, list):
         player_regions = {r.name: r for r in player_regions}
 
     #Grab all the player's regions and take note of those with locations
-    for region in player_regions.values():
-        if region.locations:
-            used_regions.add(region)
-
-    #Check every known region with location for parent regions
-    checked_parent = []
-    for region in set(used_regions):
-        def checkParent(parent_region):
-            if parent_region.name in checked_parent: #dont check a region twice
-                return
-            checked_parent.append(parent_region.name)
-            used_regions.add(parent_region)
-            for entrance in parent_region.entrances:
-                if player_regions.get(entrance.parent_region.name):
-                    checkParent(entrance.parent_region)
-            return
-        checkParent(region)
+    used_regions = {region for region in player_regions.values() if region.locations}
+
+    #Walk the entrances backward from every region with location, each parent region is only visited once
+    to_check = list(used_regions)
+    while to_check:
+        region = to_check.pop()
+        for entrance in region.entrances:
+            parent_region = entrance.parent_region
+            if parent_region not in used_regions and player_regions.get(parent_region.name):
+                used_regions.add(parent_region)
+                to_check.append(parent_region)
+    return used_regions
+
+def reset_used_regions_cache_for_player(world: World, player: Optional[int] = None):
+    if player is None:
+        player = world.player
+    if hasattr(world, 'used_regions'):
+        world.used_regions.pop(player, None)
+
+def get_used_regions(world: World, multiworld: MultiWorld, player: Optional[int] = None, skipCache: bool = False) -> set:
+    """Return the set of a player's regions that are actually used in Generation, see filter_used_regions\n
+    Keep a cache of the result, it can be skipped with 'skipCache == True'\n
+    To force a Reset of the player's cache use reset_used_regions_cache_for_player
+    """
+    if player is None:
+        player = world.player
+
+    if not skipCache and player in getattr(world, 'used_regions', {}):
+        return world.used_regions[player]
+
+    used_regions = filter_used_regions([region for region in multiworld.regions if region.player == player])
+    if skipCache:
+        return used_regions
+
+    if not hasattr(world, 'used_regions'): #Cache of the used regions of each player
+        world.used_regions = {}
+    world.used_regions[player] = used_regions
     return used_regions
 
+class RequiresFunctionReads(NamedTuple):
+    items: Union[Iterable[str], Callable[[World, str], Iterable[str]]] = ()
+    categories: Union[Iterable[str], Callable[[World, str], Iterable[str]]] = ()
+    any_item: bool = False
+    static: bool = False
+    options: Union[Iterable[str], Callable[[World, str], Iterable[str]], None] = None
+
+def requires_function(items: Union[Iterable[str], Callable[[World, str], Iterable[str]]] = (),
+                      categories: Union[Iterable[str], Callable[[World, str], Iterable[str]]] = (),
+                      any_item: bool = False, static: bool = False,
+                      options: Union[Iterable[str], Callable[[World, str], Iterable[str]], None] = None):
+    """Decorator for functions used in requires, declaring which items they read from the state.\n
+    It lets the item dependency index of Rules.py know which locations and regions to recheck when one of those items is collected.
+    items and categories can either be a list of names or a function that gets (world, the function's args as written) and returns them.
+    Items passed to the function inside of its args, like {OptOne(|Item|)}, are always included.
+    A function without this decorator, or with any_item=True, is assumed to possibly read every item.\n
+    static=True is for functions that don't take the CollectionState, whose result only depends on the world (like options and item counts).
+    Those are called once when the rules are built and their result (True/False or a requires) is used in place of the call.
+    Any item in a requires they return must also be in items/categories.
+    options lists the names of the options a static function reads (the same way as items), so that the compiled requires are only
+    compiled again for players with different values of those options. A static function without it could read any option.\n
+    eg. @requires_function(categories=["Investigators"])"""
+    def decorator(func):
+        if static:
+            for parameter in inspect.signature(func).parameters.values():
+                if parameter.annotation in [CollectionState, "CollectionState"] or parameter.name == "state":
+                    raise TypeError(f"The requires function {func.__name__} is declared static but its \"{parameter.name}\" parameter takes the CollectionState, which static functions are called without.")
+        func.requires_reads = RequiresFunctionReads(items, categories, any_item, static, options)
+        return func
+    return decorator
+
+def pass_through_hook(hook: Callable) -> Callable:
+    """Decorator for the hooks of the template that only return their first argument as is.\n
+    Lets the world skip calling hooks that wouldn't change anything on paths that are run a lot,
+    so it must be removed from a hook as soon as it does something."""
+    hook.pass_through = True
+    return hook
+
+def is_pass_through_hook(hook: Callable) -> bool:
+    """Return True if the hook is marked with @pass_through_hook."""
+    return getattr(hook, "pass_through", False)
+
+def get_data_hash(data: Any) -> str:
+    """Return a stable hash of json-like data (dicts, lists, sets, strings, numbers), the same between runs of Archipelago"""
+    def default(value):
+        if isinstance(value, (set, frozenset)):
+            return sorted(value, key=str)
+        return str(value)
+
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=default).encode("utf-8")).hexdigest()
+
 def convert_to_long_string(input: str | list[str]) -> str:
     """Verify that the input is a str. If it's a list[str] then it combine them into a str in a way that works with yaml template/website options descriptions"""
     if not isinstance(input, str):
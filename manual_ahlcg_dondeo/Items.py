@@ -1,6 +1,8 @@
 from BaseClasses import Item
 from .Data import item_table
 from .Game import filler_item_name, starting_index
+from .Helpers import format_state_prog_items_key, ProgItemsCat
+from .Records import ItemRecord
 
 
 ######################
@@ -8,8 +10,9 @@ from .Game import filler_item_name, starting_index
 ######################
 
 item_id_to_name: dict[int, str] = {}
-item_name_to_item: dict[str, dict] = {}
+item_name_to_item: dict[str, ItemRecord] = {}
 item_name_groups: dict[str, str] = {}
+item_value_deltas: dict[str, tuple[tuple[str, int], ...]] = {} # state key and amount added by collecting each item with values
 advancement_item_names: set[str] = set()
 lastItemId = -1
 
@@ -23,29 +26,30 @@ if filler_item_name:
 
 # add sequential generated ids to the lists
 for key, val in enumerate(item_table):
-    if "id" in item_table[key]:
-        item_id = item_table[key]["id"]
+    # the record also turns a single category string into a tuple of one category
+    item_table[key] = ItemRecord(val)
+
+    if item_table[key].id is not None:
+        item_id = item_table[key].id
         if item_id >= count:
             count = item_id
         else:
-            raise ValueError(f"{item_table[key]['name']} has an invalid ID. ID must be at least {count + 1}")
+            raise ValueError(f"{item_table[key].name} has an invalid ID. ID must be at least {count + 1}")
 
     item_table[key]["id"] = count
-    item_table[key]["progression"] = val["progression"] if "progression" in val else False
-    if isinstance(val.get("category", []), str):
-        item_table[key]["category"] = [val["category"]]
-        
+    item_table[key]["progression"] = item_table[key].progression or False
+
     count += 1
 
 for item in item_table:
-    item_name = item["name"]
-    item_id_to_name[item["id"]] = item_name
+    item_name = item.name
+    item_id_to_name[item.id] = item_name
     item_name_to_item[item_name] = item
 
-    if item["id"] is not None:
-        lastItemId = max(lastItemId, item["id"])
+    if item.id is not None:
+        lastItemId = max(lastItemId, item.id)
 
-    for c in item.get("category", []):
+    for c in item.category or ():
         if c not in item_name_groups:
             item_name_groups[c] = []
         item_name_groups[c].append(item_name)
@@ -54,12 +58,16 @@ for item in item_table:
     item['value'] = {k.lower().strip(): v
                      for k, v in item.get('value', {}).items()}
 
-    for v in item.get("value", {}).keys():
+    for v in item.value.keys():
         group_name = f"has_{v}_value"
         if group_name not in item_name_groups:
             item_name_groups[group_name] = []
         item_name_groups[group_name].append(item_name)
 
+    if item.value:
+        item_value_deltas[item_name] = tuple((format_state_prog_items_key(ProgItemsCat.VALUE, k), int(v))
+                                             for k, v in item.value.items())
+
 item_id_to_name[None] = "__Victory__"
 item_name_to_id = {name: id for id, name in item_id_to_name.items()}
 
@@ -1,6 +1,7 @@
 from BaseClasses import Location
 from .Data import location_table
 from .Game import starting_index
+from .Records import LocationRecord
 
 
 ######################
@@ -12,11 +13,14 @@ victory_names: list[str] = []
 
 # add sequential generated ids to the lists
 for key, _ in enumerate(location_table):
-    if "victory" in location_table[key] and location_table[key]["victory"]:
+    # the record also turns a single category string into a tuple of one category
+    location_table[key] = LocationRecord(location_table[key])
+
+    if location_table[key].victory:
         victory_names.append(location_table[key]["name"])
 
-    if "id" in location_table[key]:
-        item_id = location_table[key]["id"]
+    if location_table[key].id is not None:
+        item_id = location_table[key].id
         if item_id >= count:
             count = item_id
         else:
@@ -24,37 +28,38 @@ for key, _ in enumerate(location_table):
 
     location_table[key]["id"] = count
 
-    if "region" not in location_table[key]:
+    if location_table[key].region is None:
         location_table[key]["region"] = "Manual" # all locations are in the same region for Manual
 
-    if isinstance(location_table[key].get("category", []), str):
-        location_table[key]["category"] = [location_table[key]["category"]]
-
     count += 1
 
 if not victory_names:
     # Add the game completion location, which will have the Victory item assigned to it automatically
-    location_table.append({
+    location_table.append(LocationRecord({
         "id": count + 1,
         "name": "__Manual Game Complete__",
         "region": "Manual",
         "requires": []
         # "category": custom_victory_location["category"] if "category" in custom_victory_location else []
-    })
+    }))
     victory_names.append("__Manual Game Complete__")
 
 location_id_to_name: dict[int, str] = {}
-location_name_to_location: dict[str, dict] = {}
+location_name_to_location: dict[str, LocationRecord] = {}
 location_name_groups: dict[str, list[str]] = {}
+location_hint_entrances: dict[str, str] = {} # location name: hint_entrance, for only the locations that have one
 
 for item in location_table:
-    location_id_to_name[item["id"]] = item["name"]
-    location_name_to_location[item["name"]] = item
+    location_id_to_name[item.id] = item.name
+    location_name_to_location[item.name] = item
+
+    if item.hint_entrance is not None:
+        location_hint_entrances[item.name] = item.hint_entrance
 
-    for c in item.get("category", []):
+    for c in item.category or ():
         if c not in location_name_groups:
             location_name_groups[c] = []
-        location_name_groups[c].append(item["name"])
+        location_name_groups[c].append(item.name)
 
 
 # location_id_to_name[None] = "__Manual Game Complete__"
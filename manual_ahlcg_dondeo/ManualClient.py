@@ -1,5 +1,6 @@
 from __future__ import annotations
 import asyncio
+import bisect
 import os
 import re
 import sys
@@ -51,8 +52,7 @@ class ManualClientCommandProcessor(ClientCommandProcessor):
         )
         if usable:
             location_id = self.ctx.location_names_to_id[location_name]
-            self.ctx.locations_checked.append(location_id)
-            self.ctx.syncing = True
+            self.ctx.check_location(location_id)
         else:
             self.output(response)
             return False
@@ -61,6 +61,132 @@ class ManualClientCommandProcessor(ClientCommandProcessor):
 
 
 
+class ReceivedItemsModel:
+    """The items received by the player, counted by item id and sorted in their categories for the tracker.\n
+    It only looks at the items added to ctx.items_received since its last update, and remembers which items had their count change
+    so the tracker only has to update the labels of those."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts: typing.Counter[int] = typing.Counter()
+        self.category_items: dict[str, set[int]] = {}
+        self.changed: set[int] = set()
+        self._source: Optional[list] = None
+        self._processed = 0
+
+    def update(self, ctx: ManualContext):
+        """Count the items received since the last update"""
+        if ctx.items_received is not self._source or len(ctx.items_received) < self._processed:
+            # items_received is replaced when the server sends every item again, like on reconnect
+            changed = set(self.counts)
+            self.reset()
+            self.changed = changed
+            self._source = ctx.items_received
+
+        for network_item in ctx.items_received[self._processed:]:
+            item_id = getattr(network_item, "item", None)
+            if item_id is None: # the victory button adds a marker that isn't an item
+                continue
+
+            if item_id not in self.counts:
+                item_data = ctx.get_item_by_name(ctx.item_names.lookup_in_game(item_id))
+                for category in item_data.get("category") or ["(No Category)"]:
+                    self.category_items.setdefault(category, set()).add(item_id)
+
+            self.counts[item_id] += 1
+            self.changed.add(item_id)
+
+        self._processed = len(ctx.items_received)
+
+    def take_changed(self) -> set[int]:
+        """Return the ids of the items whose count changed since the last call"""
+        changed, self.changed = self.changed, set()
+        return changed
+
+
+class CheckOutbox:
+    """The location checks that the server hasn't confirmed yet.\n
+    Checks made within coalesce_window seconds of the first one are sent together in one LocationChecks message.
+    They are kept in a file of the seed and slot until the server confirms them, so the checks made while disconnected
+    or lost with the connection are sent again on the next connection, even after the client was closed."""
+    coalesce_window = 0.25
+
+    def __init__(self):
+        self.pending: dict[int, None] = {} # not confirmed by the server, in the order they were checked
+        self.unsent: dict[int, None] = {}
+        self.first_unsent_time: Optional[float] = None
+        self.path: Optional[str] = None
+
+    def open(self, seed_name: str, slot: int, checked_locations: typing.Collection[int]):
+        """Load the checks left from earlier sessions of this seed and slot, then queue every unconfirmed check to be sent again"""
+        path = Utils.user_path("manual_outbox", f"{seed_name}_{slot}.json")
+        if path != self.path:
+            if self.path is not None:
+                self.pending = {} # the checks of the previous seed stay in its file
+            self.path = path
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.pending.update(dict.fromkeys(json.load(f)))
+            except (OSError, ValueError):
+                pass
+
+        self.confirm(checked_locations)
+        self.unsent = dict(self.pending)
+        # sent right away since they were already waiting
+        self.first_unsent_time = time.time() - self.coalesce_window if self.unsent else None
+
+    def add(self, location_id: int):
+        if location_id in self.pending:
+            return
+        self.pending[location_id] = None
+        self.unsent[location_id] = None
+        if self.first_unsent_time is None:
+            self.first_unsent_time = time.time()
+        self.save()
+
+    def time_until_send(self) -> Optional[float]:
+        """Seconds until the unsent checks should be sent, None if there is nothing to send"""
+        if not self.unsent:
+            return None
+        return max(0.0, self.first_unsent_time + self.coalesce_window - time.time())
+
+    def take_unsent(self) -> list[int]:
+        unsent = list(self.unsent)
+        self.unsent = {}
+        self.first_unsent_time = None
+        return unsent
+
+    def confirm(self, checked_locations: typing.Collection[int]):
+        """Forget the checks that the server has received"""
+        confirmed = [location_id for location_id in self.pending if location_id in checked_locations]
+        if not confirmed:
+            return
+        for location_id in confirmed:
+            del self.pending[location_id]
+            self.unsent.pop(location_id, None)
+        if not self.unsent:
+            self.first_unsent_time = None
+        self.save()
+
+    def save(self):
+        if self.path is None:
+            return
+        try:
+            if not self.pending:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            # written next to the file then moved over it, so that a crash never leaves it half written
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary_path = f"{self.path}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as f:
+                json.dump(list(self.pending), f)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save the unsent location checks to {self.path}: {e}")
+
+
 class ManualContext(SuperContext):
     command_processor = ManualClientCommandProcessor
     game = None  # this is changed in server_auth below based on user input
@@ -75,9 +201,7 @@ class ManualContext(SuperContext):
     tracker_reachable_locations = []
     tracker_reachable_events = []
 
-    set_deathlink = False
     last_death_link = 0
-    deathlink_out = False
 
     search_term = ""
 
@@ -102,11 +226,54 @@ class ManualContext(SuperContext):
             if hasattr(self, "set_events_callback"):
                 super().set_events_callback(self.on_tracker_events) # Universal Tracker takes this func and calls it when events are calculated
 
+        # set whenever the watcher has something to do, see game_watcher_manual
+        self.watcher_event = asyncio.Event()
+        self._syncing = False
+        self._set_deathlink = False
+        self._deathlink_out = False
+
         self.send_index: int = 0
-        self.syncing = False
+        self.received_items = ReceivedItemsModel()
+        self.check_outbox = CheckOutbox()
         self.game = game
         self.username = player_name
 
+    def check_location(self, location_id: int):
+        """Queue a location check to be sent to the server"""
+        self.check_outbox.add(location_id)
+        self.watcher_event.set()
+
+    @property
+    def syncing(self) -> bool:
+        """Set to True to send a Sync, with the locations checked since the last one"""
+        return self._syncing
+
+    @syncing.setter
+    def syncing(self, value: bool):
+        self._syncing = value
+        if value:
+            self.watcher_event.set()
+
+    @property
+    def set_deathlink(self) -> bool:
+        return self._set_deathlink
+
+    @set_deathlink.setter
+    def set_deathlink(self, value: bool):
+        self._set_deathlink = value
+        if value:
+            self.watcher_event.set()
+
+    @property
+    def deathlink_out(self) -> bool:
+        return self._deathlink_out
+
+    @deathlink_out.setter
+    def deathlink_out(self, value: bool):
+        self._deathlink_out = value
+        if value:
+            self.watcher_event.set()
+
     async def server_auth(self, password_requested: bool = False):
         if password_requested and not self.password:
             await super(ManualContext, self).server_auth(password_requested)
@@ -194,6 +361,14 @@ class ManualContext(SuperContext):
     def on_package(self, cmd: str, args: dict):
         super().on_package(cmd, args)
 
+        if cmd in {"Connected", "RoomUpdate"}:
+            if cmd == "Connected":
+                # the checks left from an earlier session are sent again
+                self.check_outbox.open(self.seed_name, self.slot, self.checked_locations)
+            else:
+                self.check_outbox.confirm(self.checked_locations)
+            self.watcher_event.set()
+
         if cmd in {"Connected", "DataPackage"}:
             if cmd == "Connected":
                 Utils.persistent_store("client", "last_manual_game", self.game)
@@ -373,6 +548,9 @@ class ManualContext(SuperContext):
                 return self.container
 
             def clear_lists(self):
+                self.item_labels = {} # category name: {item id: Label}
+                self.item_labels_search_term = ""
+                self.bold_item_ids = set()
                 self.listed_items = {"(No Category)": []}
                 self.item_categories = ["(No Category)"]
                 self.listed_locations = {"(No Category)": [], "(Hinted)": []}
@@ -422,9 +600,9 @@ class ManualContext(SuperContext):
                     if hint["finding_player"] == self.ctx.slot:
                         if hint["location"] in self.ctx.missing_locations:
                             location = self.ctx.get_location_by_id(hint["location"])
-                            location["category"] = location.get("category", [])
-                            if "(Hinted)" not in location["category"]:
-                                location["category"].append("(Hinted)")
+                            if "(Hinted)" not in location.get("category", []):
+                                # categories of the apworld's own locations are tuples, so build a new list instead of appending
+                                location["category"] = [*location.get("category", []), "(Hinted)"]
                                 rebuild = True
 
                 if rebuild:
@@ -599,6 +777,7 @@ class ManualContext(SuperContext):
             def request_update_tracker_and_locations_table(self, update_highlights=False):
                 self.update_requested_time = time.time()
                 self.update_requested_highlights = update_highlights or self.update_requested_highlights # if any of the requests wanted highlights, do highlight
+                self.ctx.watcher_event.set()
 
             def update_tracker_and_locations_table(self, update_highlights=False):
                 items_length = len(self.ctx.items_received)
@@ -628,6 +807,16 @@ class ManualContext(SuperContext):
                         items_received_label = next(treeview_nodes) # always the first node
                         items_received_label.text = "Items Received (%s)" % (items_length)
 
+                        # only the labels of the items whose count changed are updated, unless the search changed
+                        received_items = self.ctx.received_items
+                        received_items.update(self.ctx)
+                        changed_item_ids = received_items.take_changed()
+                        search_changed = self.item_labels_search_term != self.ctx.search_term
+                        self.item_labels_search_term = self.ctx.search_term
+
+                        def item_matches_search(item_name: str) -> bool:
+                            return not self.ctx.search_term or self.ctx.search_term.lower() in item_name.lower()
+
                         # loop for each category in listed items and get the label + scrollview
                         for x in range(0, len(self.item_categories)):
                             category_label = next(treeview_nodes) # TreeViewLabel for category
@@ -639,78 +828,52 @@ class ManualContext(SuperContext):
                                 category_grid = category_scrollview.children[0] # GridLayout
 
                                 category_name = re.sub(r"\s\(\d+\)$", "", category_label.text)
-                                category_count = 0
-                                category_unique_name_count = 0
-
-                                existing_item_labels = []
-                                bold_item_labels = []
-
-                                # for items that were already listed, determine if the qty changed. if it did, add them to the list to be bolded
-                                for item in category_grid.children:
-                                    if type(item) is Label:
-                                        # Get the item name from the item Label, minus quantity, then do a lookup for count
-                                        old_item_text = item.text
-                                        item_name = re.sub(r"\s\(\d+\)$", "", item.text)
-                                        item_id = self.ctx.item_names_to_id[item_name]
-                                        item_count = len(list(i for i in self.ctx.items_received if i.item == item_id))
-
-                                        # if the player is searching for text and the item name doesn't contain it, skip it
-                                        if self.ctx.search_term and not self.ctx.search_term.lower() in item_name.lower():
-                                            item.width = 0
-                                            item.height = 0
-                                            item.opacity = 0
-                                        else:
-                                            item.width = dp(400)
-                                            item.height = dp(30)
-                                            item.opacity = 1
-
-                                            if item_count > 0:
-                                                category_count += item_count
-                                                category_unique_name_count += 1
-
-                                        # Update the label quantity
-                                        item.text="%s (%s)" % (item_name, item_count)
-
-                                        if update_highlights and (old_item_text != item.text):
-                                            bold_item_labels.append(item_name)
-
-                                        existing_item_labels.append(item_name)
-
-                                # instead of reusing existing item listings, clear it all out and re-draw with the sorted list
-                                category_grid.clear_widgets()
-                                self.listed_items[category_name].clear()
-                                category_count = 0
-                                category_unique_name_count = 0
-
-                                # Label (for all item listings)
-                                sorted_items_received = sorted([
-                                    i.item for i in self.ctx.items_received
-                                ])
-
-                                for network_item in sorted_items_received:
-                                    item_name = self.ctx.item_names.lookup_in_game(network_item)
-                                    item_data = self.ctx.get_item_by_name(item_name)
-
-                                    # if the player is searching for text and the item name doesn't contain it, skip it
-                                    if self.ctx.search_term and not self.ctx.search_term.lower() in item_name.lower():
+                                category_labels = self.item_labels.setdefault(category_name, {})
+                                category_item_ids = received_items.category_items.get(category_name, set())
+
+                                # the labels of items no longer received are kept, with a count of 0, until the table is rebuilt
+                                for item_id in category_item_ids | category_labels.keys():
+                                    item_label = category_labels.get(item_id)
+                                    is_new = item_label is None
+
+                                    if is_new:
+                                        item_label = Label(size_hint=(None, None), height=dp(30), width=dp(400))
+                                        # keep the labels sorted by item id, kivy lists the children from last to first
+                                        listed_item_ids = self.listed_items.setdefault(category_name, [])
+                                        position = bisect.bisect_left(listed_item_ids, item_id)
+                                        category_grid.add_widget(item_label, len(listed_item_ids) - position)
+                                        listed_item_ids.insert(position, item_id)
+                                        category_labels[item_id] = item_label
+                                    elif item_id not in changed_item_ids and not search_changed:
                                         continue
 
-                                    if "category" not in item_data or not item_data["category"]:
-                                        item_data["category"] = ["(No Category)"]
-
-                                    if category_name in item_data["category"] and network_item not in self.listed_items[category_name]:
-                                        item_count = len(list(i for i in self.ctx.items_received if i.item == network_item))
-                                        item_text = Label(text="%s (%s)" % (item_name, item_count),
-                                                    size_hint=(None, None), height=dp(30), width=dp(400), bold=True)
-
-                                        # if the item was previously listed and was bold, or if it wasn't previously listed at all, make it bold
-                                        item_text.bold = (update_highlights and (item_name in bold_item_labels or item_name not in existing_item_labels))
-
-                                        category_grid.add_widget(item_text)
-                                        self.listed_items[category_name].append(network_item)
-
-                                        category_count += item_count
-                                        category_unique_name_count += 1
+                                    item_name = self.ctx.item_names.lookup_in_game(item_id)
+                                    item_label.text = "%s (%s)" % (item_name, received_items.counts[item_id])
+
+                                    # if the player is searching for text and the item name doesn't contain it, hide it
+                                    if item_matches_search(item_name):
+                                        item_label.width = dp(400)
+                                        item_label.height = dp(30)
+                                        item_label.opacity = 1
+                                    else:
+                                        item_label.width = 0
+                                        item_label.height = 0
+                                        item_label.opacity = 0
+
+                                    if is_new or item_id in changed_item_ids:
+                                        item_label.bold = update_highlights
+                                        if update_highlights:
+                                            self.bold_item_ids.add(item_id)
+
+                                # the items that were highlighted by the previous update but didn't change since
+                                for item_id in self.bold_item_ids - changed_item_ids:
+                                    if item_id in category_labels:
+                                        category_labels[item_id].bold = False
+
+                                visible_item_ids = [item_id for item_id in category_item_ids
+                                                    if item_matches_search(self.ctx.item_names.lookup_in_game(item_id))]
+                                category_count = sum(received_items.counts[item_id] for item_id in visible_item_ids)
+                                category_unique_name_count = len(visible_item_ids)
 
                             scrollview_height = 30 * category_unique_name_count
 
@@ -728,6 +891,8 @@ class ManualContext(SuperContext):
 
                             category_scrollview.size=(Window.width / 2, scrollview_height)
 
+                        self.bold_item_ids &= changed_item_ids
+
                     #
                     # Structure of locations:
                     # LocationsLayoutScrollable -> TreeView -> TreeViewLabel, TreeViewScrollView -> GridLayout -> Button
@@ -845,30 +1010,45 @@ class ManualContext(SuperContext):
                     raise Exception("Locations were not loaded correctly. Please reconnect your client.")
 
                 if location_id:
-                    self.ctx.locations_checked.append(location_id)
-                    self.ctx.syncing = True
+                    self.ctx.check_location(location_id)
                     button.parent.remove_widget(button)
 
-                    # message = [{"cmd": 'LocationChecks', "locations": [location_id]}]
-                    # self.ctx.send_msgs(message)
-
             def victory_button_callback(self, button):
                 self.ctx.items_received.append("__Victory__")
                 self.ctx.syncing = True
 
         return ManualManager
 
+async def wait_for_watcher_event(ctx: ManualContext, timeout: Optional[float] = None):
+    """Wait until the watcher has something to do, the client is closing or the timeout is over"""
+    waits = {asyncio.create_task(ctx.watcher_event.wait()), asyncio.create_task(ctx.exit_event.wait())}
+    _, pending = await asyncio.wait(waits, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+
+
 async def game_watcher_manual(ctx: ManualContext):
     while not ctx.exit_event.is_set():
+        # anything that happens while this runs sets the event again, so it's cleared first
+        ctx.watcher_event.clear()
+
+        timeouts = []
         if ctx.ui:
             ctx.ui.check_for_requested_update()
+            if ctx.ui.update_requested_time:
+                # the tracker waits 0.25 seconds after the last update request, in case there are more coming in
+                timeouts.append(max(0.0, ctx.ui.update_requested_time + 0.25 - time.time()))
 
         if ctx.syncing == True:
-            sync_msg = [{'cmd': 'Sync'}]
-            if ctx.locations_checked:
-                sync_msg.append({"cmd": "LocationChecks", "locations": list(ctx.locations_checked)})
-            await ctx.send_msgs(sync_msg)
             ctx.syncing = False
+            await ctx.send_msgs([{'cmd': 'Sync'}])
+
+        # checks are only sent while connected, the outbox sends them again on the next connection otherwise
+        check_timeout = ctx.check_outbox.time_until_send() if ctx.server and ctx.slot is not None else None
+        if check_timeout == 0:
+            await ctx.send_msgs([{"cmd": "LocationChecks", "locations": ctx.check_outbox.take_unsent()}])
+        elif check_timeout is not None:
+            timeouts.append(check_timeout)
 
         if ctx.set_deathlink:
             ctx.set_deathlink = False
@@ -878,22 +1058,22 @@ async def game_watcher_manual(ctx: ManualContext):
             ctx.deathlink_out = False
             await ctx.send_death()
 
-        sending = []
         victory = ("__Victory__" in ctx.items_received)
-        ctx.locations_checked = sending
-        message = [{"cmd": 'LocationChecks', "locations": sending}]
-        await ctx.send_msgs(message)
         if not ctx.finished_game and victory:
             await ctx.send_msgs([{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}])
             ctx.finished_game = True
-        await asyncio.sleep(0.1)
+
+        await wait_for_watcher_event(ctx, min(timeouts, default=None))
 
 
 def read_apmanual_file(apmanual_file):
-    from base64 import b64decode
+    from .ManualFile import read_apmanual_file_cached, read_shared_apmanual_data
 
-    with open(apmanual_file, 'r') as f:
-        return json.loads(b64decode(f.read()))
+    cache_directory = Utils.cache_path("manual", "apmanual")
+    data = read_apmanual_file_cached(apmanual_file, cache_directory)
+    if "shared_data" in data:
+        data = read_shared_apmanual_data(apmanual_file, data, cache_directory)
+    return data
 
 
 async def main(args):
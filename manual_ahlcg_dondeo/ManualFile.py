@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from base64 import b64decode
+from typing import Any, NamedTuple, Optional
+
+# .apmanual files start with this header followed by the version of their format,
+# since version 2 by the sha256 of their json content, and the rest is that json compressed with zlib.
+# Files without the header are the legacy format, base64 encoded json.
+apmanual_magic = b"APMANUAL"
+apmanual_version = 2
+apmanual_hash_length = 32 # bytes of a sha256 digest
+
+class ApmanualHeader(NamedTuple):
+    version: int # 0 for the legacy format
+    data_hash: Optional[str] # None before version 2
+    length: int # bytes before the compressed content
+
+def encode_apmanual(data: dict[str, Any]) -> bytes:
+    """Return the content of an .apmanual file holding the data"""
+    content = json.dumps(data, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return apmanual_magic + apmanual_version.to_bytes(2, "little") + hashlib.sha256(content).digest() + zlib.compress(content, 9)
+
+def read_apmanual_header(content: bytes) -> ApmanualHeader:
+    """Return the format version and content hash of an .apmanual file, only the first few bytes of the file are needed"""
+    if not content.startswith(apmanual_magic):
+        return ApmanualHeader(0, None, 0)
+
+    length = len(apmanual_magic) + 2
+    version = int.from_bytes(content[len(apmanual_magic):length], "little")
+    if version > apmanual_version:
+        raise ValueError(f"This .apmanual file uses version {version} of the format but this client only knows up to version {apmanual_version}.\
+            \nPlease update the client (the apworld) to open it.")
+
+    if version < 2:
+        return ApmanualHeader(version, None, length)
+    return ApmanualHeader(version, content[length:length + apmanual_hash_length].hex(), length + apmanual_hash_length)
+
+def decode_apmanual(content: bytes) -> dict[str, Any]:
+    """Return the data of an .apmanual file, in the current format or an older one"""
+    header = read_apmanual_header(content)
+    if header.version == 0:
+        return json.loads(b64decode(content))
+
+    return json.loads(zlib.decompress(content[header.length:]))
+
+# how many files are kept in the cache directory of read_apmanual_file_cached, the ones used the longest ago are removed first
+apmanual_cache_size = 32
+
+def _read_cache_file(cached_path: str) -> dict[str, Any]:
+    with open(cached_path, "r", encoding="utf-8") as cached_file:
+        data = json.load(cached_file)
+
+    try:
+        # the modification time is when the file was last used, for the eviction
+        os.utime(cached_path)
+    except OSError:
+        pass
+
+    return data
+
+def _evict_apmanual_cache(cache_directory: str):
+    """Remove the cache files used the longest ago when there are more than apmanual_cache_size, and temporary files left by a crash."""
+    try:
+        entries = [entry for entry in os.scandir(cache_directory) if entry.is_file()]
+        cache_entries = sorted((entry for entry in entries if entry.name.endswith(".json")), key=lambda entry: entry.stat().st_mtime, reverse=True)
+        old_entries = cache_entries[apmanual_cache_size:]
+        old_entries.extend(entry for entry in entries if entry.name.endswith(".tmp") and time.time() - entry.stat().st_mtime > 24 * 60 * 60)
+
+        for entry in old_entries:
+            os.remove(entry.path)
+    except OSError as e:
+        logging.debug(f"Could not clean up the .apmanual cache directory {cache_directory}: {e}")
+
+def read_apmanual_file_cached(apmanual_file: str, cache_directory: str) -> dict[str, Any]:
+    """Return the data of an .apmanual file.\n
+    The data of files with a content hash is kept in cache_directory, named after that hash,
+    so opening a file that was already opened once only reads its header and the cached json.
+    Only the apmanual_cache_size files used last are kept."""
+    with open(apmanual_file, 'rb') as f:
+        header = read_apmanual_header(f.read(len(apmanual_magic) + 2 + apmanual_hash_length))
+        if header.data_hash is None:
+            f.seek(0)
+            return decode_apmanual(f.read())
+
+        cached_path = os.path.join(cache_directory, f"{header.data_hash}.json")
+        try:
+            return _read_cache_file(cached_path)
+        except (OSError, ValueError):
+            pass
+
+        f.seek(0)
+        data = decode_apmanual(f.read())
+
+    try:
+        # written next to the file then moved over it, so that another client never reads it half written
+        os.makedirs(cache_directory, exist_ok=True)
+        temporary_path = f"{cached_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as cached_file:
+            json.dump(data, cached_file, separators=(",", ":"))
+        os.replace(temporary_path, cached_path)
+    except OSError as e:
+        logging.debug(f"Could not save the .apmanual cache file {cached_path}: {e}")
+
+    _evict_apmanual_cache(cache_directory)
+    return data
+
+# With shared_output_data in meta.json, the items/locations/categories of the game are written once per seed in a file named after their hash,
+# and each .apmanual file only lists which of them exist for its player.
+apmanual_shared_data_suffix = ".apmanualdata"
+
+def write_shared_apmanual_data(output_directory: str, game: str, shared_data: dict[str, Any]) -> dict[str, str]:
+    """Write the shared data file of a game if it isn't already in output_directory and return the reference to it for the .apmanual files"""
+    content = encode_apmanual(shared_data)
+    data_hash = read_apmanual_header(content).data_hash
+    filename = f"{game}_{data_hash[:16]}{apmanual_shared_data_suffix}"
+    path = os.path.join(output_directory, filename)
+
+    if not os.path.exists(path):
+        # every slot of the game writes the same content, so whichever one is moved in last doesn't matter
+        temporary_path = f"{path}.{os.getpid()}.{id(shared_data)}.tmp"
+        with open(temporary_path, 'wb') as f:
+            f.write(content)
+        os.replace(temporary_path, path)
+
+    return {"file": filename, "hash": data_hash}
+
+def read_shared_apmanual_data(apmanual_file: str, data: dict[str, Any], cache_directory: str) -> dict[str, Any]:
+    """Return the data of an .apmanual file with the shared data it references filled in.\n
+    The shared data file is looked for next to the .apmanual file, then in cache_directory if it was opened before."""
+    reference = data["shared_data"]
+    shared_path = os.path.join(os.path.dirname(apmanual_file), reference["file"])
+    if os.path.exists(shared_path):
+        shared_data = read_apmanual_file_cached(shared_path, cache_directory)
+    else:
+        try:
+            shared_data = _read_cache_file(os.path.join(cache_directory, f"{reference['hash']}.json"))
+        except (OSError, ValueError):
+            raise FileNotFoundError(f"This .apmanual file needs the file {reference['file']} from the same output to be in the same folder.")
+
+    return {
+        **{key: value for key, value in data.items() if key != "shared_data"},
+        "items": {name: shared_data["items"][name] for name in data["items"] if name in shared_data["items"]},
+        "locations": {name: shared_data["locations"][name] for name in data["locations"] if name in shared_data["locations"]},
+        "categories": shared_data["categories"],
+    }
@@ -69,3 +69,5 @@ world_description: str = set_world_description("""
 world_webworld: ManualWeb = set_world_webworld(ManualWeb())
 
 enable_region_diagram = bool(meta_table.get("enable_region_diagram", False))
+shared_output_data = bool(meta_table.get("shared_output_data", False))
+check_goal_reachable = bool(meta_table.get("check_goal_reachable", False))
@@ -0,0 +1,129 @@
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Iterator, Optional
+
+
+class ManualRecord(MutableMapping):
+    """Compact storage for a single item/location/region of the data files.\n
+    The known properties are stored in __slots__ and can be read as attributes (None when they aren't set),
+    while the record still behaves like the dict it was made from: record["name"], record.get("category", []),
+    "requires" in record, etc. all work as before. Properties that aren't known are kept in a small dict on the side.\n
+    Categories are stored as tuples of interned strings, so the same category name is only ever stored once."""
+    __slots__ = ("_extra",)
+
+    _fields: frozenset[str] = frozenset()
+    _interned_fields = frozenset({"name", "region"})
+    _tuple_fields = frozenset({"category"})
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = frozenset(cls.__slots__)
+
+    def __init__(self, data: Optional[dict] = None, **kwargs):
+        for field in self._fields:
+            object.__setattr__(self, field, None)
+        self._extra = None
+
+        if data:
+            self.update(data)
+        if kwargs:
+            self.update(kwargs)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._fields:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._fields:
+            if key in self._tuple_fields:
+                if isinstance(value, str):
+                    value = (value,)
+                if isinstance(value, (list, tuple, set)):
+                    value = tuple(sys.intern(v) if isinstance(v, str) else v for v in value)
+            elif key in self._interned_fields and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, key, value)
+            return
+
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._fields:
+            if getattr(self, key) is None:
+                raise KeyError(key)
+            setattr(self, key, None)
+            return
+
+        if self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._fields:
+            return getattr(self, key) is not None
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for field in self.__slots__:
+            if getattr(self, field) is not None:
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._fields:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a plain dict copy of this record, with lists instead of tuples, for json/hooks that need a real dict."""
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in self.items()}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ItemRecord(ManualRecord):
+    __slots__ = ("name", "id", "category", "count", "value", "progression", "progression_skip_balancing",
+                 "useful", "trap", "filler", "early", "local", "local_early")
+
+    name: str
+    id: Optional[int]
+    category: Optional[tuple[str, ...]]
+    count: Optional[int]
+    value: Optional[dict[str, int]]
+    progression: Optional[bool]
+
+class LocationRecord(ManualRecord):
+    __slots__ = ("name", "id", "region", "category", "requires", "victory", "prehint", "hint_entrance",
+                 "place_item", "place_item_category", "dont_place_item", "dont_place_item_category")
+
+    name: str
+    id: Optional[int]
+    region: Optional[str]
+    category: Optional[tuple[str, ...]]
+    requires: Optional[str | list]
+    hint_entrance: Optional[str]
+
+class RegionRecord(ManualRecord):
+    __slots__ = ("name", "requires", "connects_to", "starting", "entrance_requires", "exit_requires")
+
+    name: Optional[str]
+    requires: Optional[str | list]
+    connects_to: Optional[list[str]]
+    starting: Optional[bool]
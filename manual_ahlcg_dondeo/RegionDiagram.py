@@ -0,0 +1,105 @@
+import os
+import re
+from collections import deque
+from typing import NamedTuple, Optional
+
+from BaseClasses import MultiWorld, Item, Location, LocationProgressType
+
+from .Helpers import get_data_hash
+
+# The diagram is rendered the same way as Utils.visualize_regions of Archipelago, but from a snapshot of the regions
+# so that it can be rendered while fill places items in the actual locations.
+
+class RegionSnapshot(NamedTuple):
+    name: str
+    exits: tuple[tuple[str, Optional[str]], ...] # the name of each exit and of the region it leads to
+    locations: tuple[tuple[str, bool, Optional[str]], ...] # the formatted name of each location, if it is locked and its formatted item
+
+def _format_name(name: str) -> str:
+    return re.sub("[\".:]", "", name)
+
+def _format_location(location: Location) -> str:
+    name = location.name
+    if location.progress_type == LocationProgressType.PRIORITY:
+        name = f"**{name}**"
+    elif location.progress_type == LocationProgressType.EXCLUDED:
+        name = f"--{name}--"
+    return _format_name(name)
+
+def _format_item(multiworld: MultiWorld, item: Item) -> str:
+    name = multiworld.get_name_string_for_object(item)
+    if item.advancement:
+        name = f"**{name}**"
+    if item.useful:
+        name = f"//{name}//"
+    if item.trap:
+        name = f"--{name}--"
+    return _format_name(name)
+
+def snapshot_regions(multiworld: MultiWorld, player: int) -> list[RegionSnapshot]:
+    """Return what the diagram shows of the player's regions as they are now, with the items placed so far."""
+    return [RegionSnapshot(
+        region.name,
+        tuple((exit.name, exit.connected_region.name if exit.connected_region else None) for exit in region.exits),
+        tuple((_format_location(location), location.locked, _format_item(multiworld, location.item) if location.item else None) for location in region.locations)
+    ) for region in multiworld.get_regions(player)]
+
+def get_region_diagram_hash(snapshot: list[RegionSnapshot]) -> str:
+    """Return a hash of everything the diagram of the snapshot shows, the same diagram can be used again for the same hash."""
+    return get_data_hash(snapshot)
+
+def render_region_diagram(snapshot: list[RegionSnapshot], path: str, root_region: str = "Menu"):
+    """Write the puml diagram of the snapshot to path, unless it was already rendered."""
+    if os.path.exists(path):
+        return
+
+    regions = {region.name: region for region in snapshot}
+    uml = ["@startuml", "hide circle", "hide empty members", "skinparam linetype ortho"]
+    seen = set()
+    queue = deque([root_region])
+
+    while queue:
+        region = regions[queue.popleft()]
+        if region.name in seen:
+            continue
+        seen.add(region.name)
+
+        region_name = _format_name(region.name)
+        uml.append(f"class \"{region_name}\"")
+
+        any_lock = any(locked for _, locked, _ in region.locations)
+        for location_name, locked, item_name in region.locations:
+            lock = "<&lock-locked> " if locked else "<&lock-unlocked,color=transparent> " if any_lock else ""
+            if item_name is not None:
+                uml.append(f"\"{region_name}\" : {{method}} {lock}{location_name}: {item_name}")
+            else:
+                uml.append(f"\"{region_name}\" : {{field}} {lock}{location_name}")
+
+        for exit_name, connected_region in region.exits:
+            if connected_region is None:
+                uml.append(f"circle \"unconnected exit:\\n{_format_name(exit_name)}\"")
+                uml.append(f"\"{region_name}\" --> \"unconnected exit:\\n{_format_name(exit_name)}\"")
+                continue
+
+            # an exit going back to a region that leads here is drawn as a single two way arrow
+            connected_name = _format_name(connected_region)
+            try:
+                uml.remove(f"\"{connected_name}\" --> \"{region_name}\"")
+                uml.append(f"\"{connected_name}\" <--> \"{region_name}\"")
+            except ValueError:
+                uml.append(f"\"{region_name}\" --> \"{connected_name}\"")
+            queue.append(connected_region)
+
+    other_regions = [region.name for region in snapshot if region.name not in seen]
+    if other_regions:
+        uml.append("package \"other regions\" <<Cloud>> {")
+        uml.extend(f"class \"{_format_name(region_name)}\"" for region_name in other_regions)
+        uml.append("}")
+    uml.append("@enduml")
+
+    # written next to the file then moved over it, so that another generation never copies it half written
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(uml))
+    os.replace(temporary_path, path)
@@ -2,22 +2,26 @@ from BaseClasses import Entrance, MultiWorld, Region
 from .Helpers import is_category_enabled, is_location_enabled
 from .Data import region_table
 from .Locations import ManualLocation, location_name_to_location
+from .Records import RegionRecord
 from worlds.AutoWorld import World
 
 
 if not region_table:
     region_table = {}
 
+for name in region_table:
+    region_table[name] = RegionRecord(region_table[name])
+
 regionMap = { **region_table }
-starting_regions = [ name for name in regionMap if "starting" in regionMap[name].keys() and regionMap[name]["starting"] ]
+starting_regions = [ name for name in regionMap if regionMap[name].starting ]
 
 if len(starting_regions) == 0:
     starting_regions = region_table.keys() # the Manual region connects to all user-defined regions automatically if you specify no starting regions
 
-regionMap["Manual"] = {
+regionMap["Manual"] = RegionRecord({
     "requires": [],
     "connects_to": starting_regions
-}
+})
 
 
 def create_regions(world: World, multiworld: MultiWorld, player: int):
@@ -34,9 +38,9 @@ def create_regions(world: World, multiworld: MultiWorld, player: int):
 
         locations = []
         for location in world.location_table:
-            if "region" in location and location["region"] == region:
+            if location.region == region:
                 if is_location_enabled(multiworld, player, location):
-                    locations.append(location["name"])
+                    locations.append(location.name)
 
         new_region = create_region(world, multiworld, player, region, locations, exit_array)
         multiworld.regions += [new_region]
@@ -60,7 +64,7 @@ def create_region(world: World, multiworld: MultiWorld, player: int, name: str,
         for location in locations:
             loc_id = world.location_name_to_id.get(location, 0)
             locationObj = ManualLocation(player, location, loc_id, ret)
-            if location_name_to_location[location].get('prehint'):
+            if location_name_to_location[location].prehint:
                 world.options.start_location_hints.value.add(location)
             ret.locations.append(locationObj)
     if exits:
@@ -0,0 +1,354 @@
+import re
+from enum import IntEnum
+from typing import Iterator, NamedTuple, Optional, Union
+
+
+class LogicErrorSource(IntEnum):
+    INFIX_TO_POSTFIX = 1 # includes more closing parentheses than opening (but not the opposite)
+    EVALUATE_POSTFIX = 2 # includes missing pipes and missing value on either side of AND/OR
+    EVALUATE_STACK_SIZE = 3 # includes missing curly brackets
+
+class RequiresSyntaxError(Exception):
+    """Raised when a requires string cannot be parsed, source tells which kind of invalid syntax was found."""
+    def __init__(self, requires: str, source: LogicErrorSource):
+        super().__init__(f"Invalid requires '{requires}' (ERROR {source})")
+        self.requires = requires
+        self.source = source
+
+
+######################
+# Tokens
+######################
+
+class TokenType(IntEnum):
+    TEXT = 0 # anything that isn't part of the grammar, like whitespace
+    ITEM = 1 # |Item:count| or |@Category:count|
+    FUNCTION = 2 # {Function(args)}
+    AND = 3
+    OR = 4
+    NOT = 5
+    OPEN = 6
+    CLOSE = 7
+    CONSTANT = 8 # a bare 0 or 1, usually the result of a function
+
+class ItemRequire(NamedTuple):
+    name: str
+    count: str # kept as written since it can also be 'all', 'half' or a percentage
+    category: bool
+
+class FunctionRequire(NamedTuple):
+    name: str
+    args: str
+
+class Token(NamedTuple):
+    type: TokenType
+    text: str
+    value: Union[ItemRequire, FunctionRequire, bool, None] = None
+
+# only the start of a function is matched here, its arguments end at the matching closing parenthesis, see _find_function_end
+_token_pattern = re.compile(r"""
+      (?P<function>\{(?P<func_name>\w+)\()
+    | (?P<item>\|[^|]+\|)
+    | (?P<and>\bAND\b)
+    | (?P<or>\bOR\b)
+    | (?P<not>!)
+    | (?P<open>\()
+    | (?P<close>\))
+    | (?P<constant>[01])
+""", re.IGNORECASE | re.VERBOSE)
+
+
+######################
+# Parse tree
+######################
+
+class ConstantRequire(NamedTuple):
+    value: bool
+
+class AndRequire(NamedTuple):
+    children: tuple
+
+class OrRequire(NamedTuple):
+    children: tuple
+
+class NotRequire(NamedTuple):
+    child: "RequireNode"
+
+RequireNode = Union[ItemRequire, FunctionRequire, ConstantRequire, AndRequire, OrRequire, NotRequire]
+
+# Every requires string is only tokenized and parsed once per data load, these are emptied by clear_cache()
+_token_cache: dict[str, tuple[Token, ...]] = {}
+_tree_cache: dict[str, RequireNode] = {}
+
+def clear_cache():
+    """Forget every tokenized and parsed requires, to be used when the data files are reloaded."""
+    _token_cache.clear()
+    _tree_cache.clear()
+
+def parse_item(text: str) -> ItemRequire:
+    """Parse a single item or category require, with or without its surrounding ||.\n
+    eg. '|@Category:half|' -> ItemRequire(name='Category', count='half', category=True)"""
+    category = text.lstrip("|").startswith("@")
+    item_parts = text.lstrip("|@$").rstrip("|").split(":")
+    item_name = item_parts[0].strip()
+    item_count = item_parts[1].strip() if len(item_parts) > 1 else "1"
+
+    return ItemRequire(item_name, item_count, category)
+
+def _find_function_end(requires: str, args_start: int) -> int:
+    """Return the index right after the )} closing the function whose arguments start at args_start, -1 if there is none.\n
+    Parentheses in the arguments are balanced, so nested calls like {OptAll({OptAll(|Item|)})} end at the outer )}.
+    Arguments with unbalanced parentheses end at the first )} like they always did."""
+    depth = 1
+    for index in range(args_start, len(requires)):
+        if requires[index] == "(":
+            depth += 1
+        elif requires[index] == ")":
+            depth -= 1
+            if depth == 0:
+                if requires.startswith(")}", index):
+                    return index + 2
+                break
+
+    first_end = requires.find(")}", args_start)
+    return first_end + 2 if first_end != -1 else -1
+
+def tokenize(requires: str) -> tuple[Token, ...]:
+    """Split a requires string into tokens. Joining the text of every token gives back the original string."""
+    tokens = _token_cache.get(requires)
+    if tokens is not None:
+        return tokens
+
+    tokens = []
+    position = 0
+    search_position = 0
+    while True:
+        match = _token_pattern.search(requires, search_position)
+        if match is None:
+            break
+
+        end = match.end()
+        if match.group("function"):
+            end = _find_function_end(requires, match.end())
+            if end == -1: # not a function after all, the { is left as text and its name and ( are tokenized as usual
+                search_position = match.start() + 1
+                continue
+
+        if match.start() > position:
+            tokens.append(Token(TokenType.TEXT, requires[position:match.start()]))
+        position = search_position = end
+
+        text = requires[match.start():end]
+        if match.group("function"):
+            tokens.append(Token(TokenType.FUNCTION, text, FunctionRequire(match.group("func_name"), text[len(match.group()):-2])))
+        elif match.group("item"):
+            tokens.append(Token(TokenType.ITEM, text, parse_item(text)))
+        elif match.group("and"):
+            tokens.append(Token(TokenType.AND, text))
+        elif match.group("or"):
+            tokens.append(Token(TokenType.OR, text))
+        elif match.group("not"):
+            tokens.append(Token(TokenType.NOT, text))
+        elif match.group("open"):
+            tokens.append(Token(TokenType.OPEN, text))
+        elif match.group("close"):
+            tokens.append(Token(TokenType.CLOSE, text))
+        else:
+            tokens.append(Token(TokenType.CONSTANT, text, text == "1"))
+
+    if position < len(requires):
+        tokens.append(Token(TokenType.TEXT, requires[position:]))
+
+    tokens = tuple(tokens)
+    _token_cache[requires] = tokens
+    return tokens
+
+def parse(requires: str) -> RequireNode:
+    """Parse a requires string into its tree, raise a RequiresSyntaxError if its syntax is invalid.\n
+    AND and OR have the same precedence and are evaluated from left to right, ! applies to what directly follows it.
+    An empty requires is always True."""
+    tree = _tree_cache.get(requires)
+    if tree is not None:
+        return tree
+
+    tokens = [token for token in tokenize(requires) if token.type != TokenType.TEXT]
+    if not tokens:
+        tree = ConstantRequire(True)
+    else:
+        parser = _Parser(requires, tokens)
+        tree = parser.parse_expression()
+
+        if parser.position < len(tokens):
+            if tokens[parser.position].type == TokenType.CLOSE:
+                raise RequiresSyntaxError(requires, LogicErrorSource.INFIX_TO_POSTFIX)
+            raise RequiresSyntaxError(requires, LogicErrorSource.EVALUATE_STACK_SIZE)
+
+    _tree_cache[requires] = tree
+    return tree
+
+class _Parser:
+    def __init__(self, requires: str, tokens: list[Token]):
+        self.requires = requires
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[TokenType]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position].type
+        return None
+
+    def parse_expression(self) -> RequireNode:
+        node = self.parse_unary()
+
+        while self.peek() in (TokenType.AND, TokenType.OR):
+            node_class = AndRequire if self.tokens[self.position].type == TokenType.AND else OrRequire
+            self.position += 1
+            right = self.parse_unary()
+
+            if isinstance(node, node_class):
+                node = node_class(node.children + (right,))
+            else:
+                node = node_class((node, right))
+
+        return node
+
+    def parse_unary(self) -> RequireNode:
+        token_type = self.peek()
+
+        if token_type == TokenType.NOT:
+            self.position += 1
+            return NotRequire(self.parse_unary())
+
+        if token_type == TokenType.OPEN:
+            self.position += 1
+            node = self.parse_expression()
+
+            # a missing closing parenthesis at the very end has always been tolerated
+            if self.peek() == TokenType.CLOSE:
+                self.position += 1
+            elif self.peek() is not None:
+                raise RequiresSyntaxError(self.requires, LogicErrorSource.EVALUATE_STACK_SIZE)
+            return node
+
+        if token_type in (TokenType.ITEM, TokenType.FUNCTION):
+            self.position += 1
+            return self.tokens[self.position - 1].value
+
+        if token_type == TokenType.CONSTANT:
+            self.position += 1
+            return ConstantRequire(self.tokens[self.position - 1].value)
+
+        # AND/OR/closing parenthesis/end of requires where a value was expected
+        raise RequiresSyntaxError(self.requires, LogicErrorSource.EVALUATE_POSTFIX)
+
+
+######################
+# Tree walking
+######################
+
+def iter_leaves(node: RequireNode) -> Iterator[Union[ItemRequire, FunctionRequire]]:
+    """Yield every item/category and function of a parsed requires."""
+    if isinstance(node, (AndRequire, OrRequire)):
+        for child in node.children:
+            yield from iter_leaves(child)
+    elif isinstance(node, NotRequire):
+        yield from iter_leaves(node.child)
+    elif isinstance(node, (ItemRequire, FunctionRequire)):
+        yield node
+
+def get_item_requires(requires: str) -> list[ItemRequire]:
+    """Return every item and category a requires string mentions, including those passed as arguments to functions.\n
+    Unlike parse(), this never raises on invalid syntax."""
+    found = []
+    for token in tokenize(requires):
+        if token.type == TokenType.ITEM:
+            found.append(token.value)
+        elif token.type == TokenType.FUNCTION:
+            found.extend(get_item_requires(token.value.args))
+    return found
+
+def get_function_requires(requires: str) -> list[FunctionRequire]:
+    """Return every function called by a requires string, without parsing it."""
+    return [token.value for token in tokenize(requires) if token.type == TokenType.FUNCTION]
+
+
+######################
+# Dict form
+######################
+
+class DictRequires(NamedTuple):
+    items: tuple[tuple[str, int], ...] # every one of these is needed...
+    or_groups: tuple[tuple[tuple[str, int], ...], ...] # ...unless every item of one of these groups is there
+
+def _parse_dict_item(item: str) -> tuple[str, int]:
+    item_parts = item.split(":")
+
+    if len(item_parts) == 1:
+        return item, 1
+
+    try:
+        return item_parts[0], int(item_parts[1])
+    except ValueError as e:
+        raise ValueError(f"Invalid item count in '{item}' of a dict/list form requires, it should look like 'Item:2'.") from e
+
+def normalize_dict_requires(requires: list) -> DictRequires:
+    """Split a requires in dict/list form into (name, count) tuples.\n
+    eg. ["A:2", {"or": ["B", "C:3"]}, ["D"]] -> DictRequires(items=(('A', 2),), or_groups=((('B', 1), ('C', 3)), (('D', 1),)))\n
+    Such a requires is met if every item of any one of the or groups is there, or if all of the other items are."""
+    items = []
+    or_groups = []
+
+    for item in requires:
+        # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
+        if isinstance(item, dict) and "or" in item and isinstance(item["or"], list):
+            or_groups.append(tuple(_parse_dict_item(or_item) for or_item in item["or"]))
+        elif isinstance(item, list):
+            or_groups.append(tuple(_parse_dict_item(or_item) for or_item in item))
+        elif isinstance(item, str):
+            items.append(_parse_dict_item(item))
+        else:
+            raise ValueError(f"Invalid entry {item} in a dict/list form requires, it should be an item name, a list of them, or {{\"or\": [...]}}.")
+
+    return DictRequires(tuple(items), tuple(or_groups))
+
+def dict_requires_to_tree(requires: DictRequires) -> RequireNode:
+    """Express a normalized dict form requires as the tree of the equivalent string requires."""
+    def items_to_node(items: tuple[tuple[str, int], ...]) -> AndRequire:
+        return AndRequire(tuple(ItemRequire(item_name, str(item_count), False) for item_name, item_count in items))
+
+    return OrRequire(tuple(items_to_node(or_items) for or_items in requires.or_groups) + (items_to_node(requires.items),))
+
+
+######################
+# Serialization
+######################
+
+def tree_to_json(node: RequireNode) -> list:
+    """Convert a parsed requires to json-compatible lists, tree_from_json() turns it back into the same tree."""
+    if isinstance(node, AndRequire):
+        return ["and", [tree_to_json(child) for child in node.children]]
+    elif isinstance(node, OrRequire):
+        return ["or", [tree_to_json(child) for child in node.children]]
+    elif isinstance(node, NotRequire):
+        return ["not", tree_to_json(node.child)]
+    elif isinstance(node, ItemRequire):
+        return ["item", node.name, node.count, node.category]
+    elif isinstance(node, FunctionRequire):
+        return ["function", node.name, node.args]
+    return ["constant", node.value]
+
+def tree_from_json(data: list) -> RequireNode:
+    node_type = data[0]
+    if node_type == "and":
+        return AndRequire(tuple(tree_from_json(child) for child in data[1]))
+    elif node_type == "or":
+        return OrRequire(tuple(tree_from_json(child) for child in data[1]))
+    elif node_type == "not":
+        return NotRequire(tree_from_json(data[1]))
+    elif node_type == "item":
+        return ItemRequire(data[1], data[2], data[3])
+    elif node_type == "function":
+        return FunctionRequire(data[1], data[2])
+    elif node_type == "constant":
+        return ConstantRequire(data[1])
+    raise ValueError(f"Unknown requires node type '{node_type}'")
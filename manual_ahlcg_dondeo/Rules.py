@@ -1,38 +1,54 @@
-from typing import TYPE_CHECKING, Optional
-from enum import IntEnum
+from typing import TYPE_CHECKING, Optional, Callable, Iterable, NamedTuple, Union
 from operator import eq, ge, le
+from collections import deque
 
+from .Data import data_fingerprint
 from .Regions import regionMap
+from .BulkRules import get_bulk_location_rules
+from .Requires import LogicErrorSource, RequiresSyntaxError, RequireNode, TokenType, ItemRequire, FunctionRequire, \
+    ConstantRequire, AndRequire, OrRequire, NotRequire, parse, parse_item, tokenize, get_item_requires, get_function_requires, \
+    DictRequires, normalize_dict_requires, dict_requires_to_tree, tree_to_json, tree_from_json
 from .hooks import Rules
 from .Helpers import clamp, is_item_enabled, is_option_enabled, get_option_value, convert_string_to_type,\
-    format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat
+    format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat, requires_function, get_data_hash
 
-from BaseClasses import MultiWorld, CollectionState
+from BaseClasses import MultiWorld, CollectionState, Region, Item
 from worlds.AutoWorld import World
 from worlds.generic.Rules import set_rule, add_rule
+from Utils import cache_path
 from Options import Choice, Toggle, Range, NamedRange
 
+import json
+import os
+import pkgutil
 import re
 import math
 import inspect
+import time
+from functools import partial
 import logging
 
 if TYPE_CHECKING:
     from . import ManualWorld
 
-class LogicErrorSource(IntEnum):
-    INFIX_TO_POSTFIX = 1 # includes more closing parentheses than opening (but not the opposite)
-    EVALUATE_POSTFIX = 2 # includes missing pipes and missing value on either side of AND/OR
-    EVALUATE_STACK_SIZE = 3 # includes missing curly brackets
+class AreaContext(NamedTuple):
+    """What the rule of a location, region or entrance knows about it. It is never modified, so checking a rule has no side effect."""
+    type: str # "location", "region" or "entrance"
+    name: str
+    requires: Union[str, list, None]
 
-def construct_logic_error(location_or_region: dict, source: LogicErrorSource) -> KeyError:
-    object_type = "location/region"
-    object_name = location_or_region.get("name", "Unknown")
+def construct_logic_error(location_or_region: Union[dict, AreaContext], source: LogicErrorSource) -> KeyError:
+    if isinstance(location_or_region, AreaContext):
+        object_type = location_or_region.type
+        object_name = location_or_region.name
+    else:
+        object_type = "location/region"
+        object_name = location_or_region.get("name", "Unknown")
 
-    if location_or_region.get("is_region", False) or "starting" in location_or_region or "connects_to" in location_or_region:
-        object_type = "region"
-    elif "region" in location_or_region or "category" in location_or_region:
-        object_type = "location"
+        if location_or_region.get("is_region", False) or "starting" in location_or_region or "connects_to" in location_or_region:
+            object_type = "region"
+        elif "region" in location_or_region or "category" in location_or_region:
+            object_type = "location"
 
     if source == LogicErrorSource.INFIX_TO_POSTFIX:
         source_text = "There may be mismatched parentheses, or other invalid syntax for the requires."
@@ -45,263 +61,718 @@ def construct_logic_error(location_or_region: dict, source: LogicErrorSource) ->
 
     return KeyError(f"Invalid 'requires' for {object_type} '{object_name}': {source_text} (ERROR {source})")
 
-def infix_to_postfix(expr, location):
-    prec = {"&": 2, "|": 2, "!": 3}
-    stack = []
-    postfix = ""
+def parse_requires_for_area(requires: str, area: Union[dict, AreaContext]) -> RequireNode:
+    """Parse a requires string, converting syntax errors to an exception that names the area it came from."""
+    try:
+        return parse(requires)
+    except RequiresSyntaxError as e:
+        raise construct_logic_error(area, e.source) from e
+
+def find_require_function(func_name: str) -> Optional[Callable]:
+    """Find a function that can be used in requires, either one of the default ones below or one from hooks/Rules.py"""
+    func = globals().get(func_name)
+
+    if func is None:
+        func = getattr(Rules, func_name, None)
+
+    return func
+
+def convert_req_function_args(world: "ManualWorld", state: Optional[CollectionState], func, args: list[str], areaName: str):
+    """Convert the args of a requires function from strings to the types in its signature, and insert the world/multiworld/state/player it asks for.\n
+    state is None when a static function is called while the rules are being built."""
+    multiworld = world.multiworld
+    player = world.player
+    parameters = inspect.signature(func).parameters
+    knownParameters = [World, 'ManualWorld', MultiWorld, CollectionState]
+    index = -1
+    for parameter in parameters.values():
+        target_type = parameter.annotation
+        index += 1
+        if target_type in knownParameters:
+            if target_type in [World, 'ManualWorld']:
+                args.insert(index, world)
+            elif target_type == MultiWorld:
+                args.insert(index, multiworld)
+            elif target_type == CollectionState:
+                args.insert(index, state)
+            continue
+        if parameter.name.lower() == "player":
+            args.insert(index, player)
+            continue
+
+        if index < len(args) and args[index] != "":
+            value = args[index].strip()
+        else:
+            if parameter.default is not inspect.Parameter.empty:
+                if index < len(args):
+                    args[index] = parameter.default
+                else:
+                    args.insert(index, parameter.default)
+                continue
+            else:
+                if parameter.annotation is inspect.Parameter.empty:
+                    raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value for its argument \"{parameter.name}\" but it's missing.")
+                else:
+                    raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type} for its argument \"{parameter.name}\" but it's missing.")
+
+        if target_type == str or parameter.annotation is inspect.Parameter.empty: #Don't convert since its already a string or if we don't know the type to convert to
+            args[index] = value
+            continue
+
+        try:
+            value = convert_string_to_type(value, target_type)
+
+        except Exception as e:
+            raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type}\nfor its argument \"{parameter.name}\" but its value \"{value}\" cannot be converted to {target_type} \nOriginal Error:'{e}'")
+
+        args[index] = value
+
+
+######################
+# Item dependency index
+######################
+
+class ItemDependencyIndex:
+    """Reverse index from item names to the entrances and locations whose access rules (as set by set_rules) read them."""
+    def __init__(self):
+        self.entrances_by_item: dict[str, set[str]] = {}
+        self.locations_by_item: dict[str, set[str]] = {}
+        # rules calling a function that could read any item, these can change whatever item is collected
+        self.any_item_entrances: set[str] = set()
+        self.any_item_locations: set[str] = set()
+
+    def add(self, name: str, is_entrance: bool, items: Iterable[str], any_item: bool = False):
+        by_item = self.entrances_by_item if is_entrance else self.locations_by_item
+        for item_name in items:
+            by_item.setdefault(item_name, set()).add(name)
+
+        if any_item:
+            (self.any_item_entrances if is_entrance else self.any_item_locations).add(name)
+
+    def get_affected(self, item_name: str) -> tuple[set[str], set[str]]:
+        """Return the names of the entrances and of the locations whose rules could change when item_name is collected or removed."""
+        return self.entrances_by_item.get(item_name, set()) | self.any_item_entrances, \
+            self.locations_by_item.get(item_name, set()) | self.any_item_locations
+
+def get_requires_dependencies(world: "ManualWorld", requires: str|list) -> tuple[set[str], bool]:
+    """Return the names of the items a requires reads, and whether it calls a function that could read any item."""
+    items = set()
+
+    if not requires:
+        return items, False
+
+    if not isinstance(requires, str):
+        dict_requires = normalize_dict_requires(requires)
+        items.update(item_name for item_name, _ in dict_requires.items)
+        for or_items in dict_requires.or_groups:
+            items.update(item_name for item_name, _ in or_items)
+        return items, False
+
+    categories = set()
+    # this includes the items passed to functions, like in {OptOne(|Item|)}
+    for item in get_item_requires(requires):
+        (categories if item.category else items).add(item.name)
+
+    for function in get_function_requires(requires):
+        reads = getattr(find_require_function(function.name), "requires_reads", None)
+        if reads is None or reads.any_item:
+            return items, True
+
+        items.update(reads.items(world, function.args) if callable(reads.items) else reads.items)
+        categories.update(reads.categories(world, function.args) if callable(reads.categories) else reads.categories)
+
+    for category in categories:
+        items.update(world.item_name_groups.get(category, []))
+
+    return items, False
+
+class IncrementalReachability:
+    """Keep track of the regions and locations of a player that can be reached with a CollectionState,
+    while only rechecking the entrances and locations whose rules can be changed by the items collected since the last update.\n
+    Rules added or replaced after set_rules (for example by the after_set_rules hook) aren't in the item dependency index,
+    the entrances and locations with those are rechecked whatever items are collected."""
+    def __init__(self, world: "ManualWorld", state: CollectionState):
+        self.world = world
+        self.player = world.player
+        self.state = state
+        self.index: ItemDependencyIndex = world.item_dependency_index # built by set_rules
+        self.changed_entrances: set[str] = set()
+        self.changed_locations: set[str] = set()
+        for region in world.multiworld.get_regions(self.player):
+            self.changed_entrances.update(exit.name for exit in region.exits if world.set_rules_access_rules.get(exit.name) is not exit.access_rule)
+            self.changed_locations.update(location.name for location in region.locations if world.set_rules_access_rules.get(location.name) is not location.access_rule)
+        self.reachable_regions: set[str] = set()
+        self.reachable_locations: set[str] = set()
+        self.passed_entrances: set[str] = set()
+        self.update_all()
+
+    def update_all(self) -> set[str]:
+        """Recheck every entrance and location from the Menu region, return the locations that became reachable."""
+        previously_reachable = set(self.reachable_locations)
+        self.reachable_regions.clear()
+        self.reachable_locations.clear()
+        self.passed_entrances.clear()
+
+        # with NumPy, the rules of every location are checked at once instead of one by one while exploring
+        bulk_location_rules = get_bulk_location_rules(self.world)
+        rule_results = bulk_location_rules.get_results(self.state) if bulk_location_rules else None
+
+        menu = self.world.multiworld.get_region("Menu", self.player)
+        self.reachable_regions.add(menu.name)
+        self.explore([menu], rule_results)
+
+        return self.reachable_locations - previously_reachable
+
+    def update(self, item_names: Iterable[str]) -> set[str]:
+        """Recheck what the newly collected items can change, return the locations that became reachable."""
+        entrance_names = set(self.changed_entrances)
+        location_names = set(self.changed_locations)
+        for item_name in item_names:
+            affected_entrances, affected_locations = self.index.get_affected(item_name)
+            entrance_names |= affected_entrances
+            location_names |= affected_locations
+
+        # an item can also close an entrance (with a ! in its requires), in which case what's behind it has to be found again
+        for entrance_name in entrance_names & self.passed_entrances:
+            if not self.world.get_entrance(entrance_name).access_rule(self.state):
+                return self.update_all()
+
+        new_regions = []
+        for entrance_name in entrance_names - self.passed_entrances:
+            entrance = self.world.get_entrance(entrance_name)
+            if entrance.parent_region.name not in self.reachable_regions or not entrance.access_rule(self.state):
+                continue
+
+            self.passed_entrances.add(entrance_name)
+            if entrance.connected_region.name not in self.reachable_regions:
+                self.reachable_regions.add(entrance.connected_region.name)
+                new_regions.append(entrance.connected_region)
+
+        new_locations = set()
+        for location_name in location_names:
+            location = self.world.multiworld.get_location(location_name, self.player)
+            if location.parent_region.name not in self.reachable_regions:
+                continue
+
+            if location.access_rule(self.state):
+                if location_name not in self.reachable_locations:
+                    self.reachable_locations.add(location_name)
+                    new_locations.add(location_name)
+            else:
+                self.reachable_locations.discard(location_name)
+
+        return new_locations | self.explore(new_regions)
+
+    def sweep(self, location_items: dict[str, Item]) -> set[str]:
+        """Collect the items at locations (location name: item) as their locations are reached, until none of the remaining ones can be.\n
+        Return the names of the locations whose item was collected."""
+        remaining = dict(location_items)
+        newly_reachable = set(self.reachable_locations)
+        while newly_reachable:
+            items = [remaining.pop(name) for name in newly_reachable if name in remaining]
+            if not items:
+                break
+
+            for item in items:
+                self.state.collect(item, True)
+            newly_reachable = self.update(item.name for item in items)
+
+        return location_items.keys() - remaining.keys()
+
+    def explore(self, regions: Iterable[Region], rule_results: Optional[dict[str, bool]] = None) -> set[str]:
+        """Check the locations and exits of newly reached regions, and of the regions they lead to.\n
+        rule_results can have the already known result of the access rules of locations."""
+        new_locations = set()
+        queue = deque(regions)
+
+        while queue:
+            region = queue.popleft()
+            for location in region.locations:
+                if location.name in self.reachable_locations:
+                    continue
+                if rule_results is not None and location.name in rule_results:
+                    rule_met = rule_results[location.name]
+                else:
+                    rule_met = location.access_rule(self.state)
+
+                if rule_met:
+                    self.reachable_locations.add(location.name)
+                    new_locations.add(location.name)
+
+            for exit in region.exits:
+                if exit.connected_region is None or exit.connected_region.name in self.reachable_regions:
+                    continue
+                if exit.access_rule(self.state):
+                    self.passed_entrances.add(exit.name)
+                    self.reachable_regions.add(exit.connected_region.name)
+                    queue.append(exit.connected_region)
+
+        return new_locations
+
+######################
+# Compiled requires
+######################
+
+class CompiledRequires:
+    """What set_rules compiles from the requires strings: their tree once static functions are expanded,
+    and the direct state.has() rule they are lowered to (None when they can't be) which takes the player as argument."""
+    def __init__(self, path: Optional[str] = None):
+        self.path = path # of the cache file
+        self.expanded_trees: dict[str, RequireNode] = {}
+        self.programs: dict[str, Optional[Callable[[CollectionState, int], bool]]] = {}
+        self.saved_tree_count = 0 # how many of the expanded trees are in the cache file
+
+# shared by the players of this manual with the same compiled requires key, so compiling the requires of the 20th slot is almost free
+compiled_requires_cache: dict[tuple[str, ...], CompiledRequires] = {}
+
+# the expanded trees are also saved in a cache file, which is only valid for the same functions
+compiled_requires_file_version = 1
+functions_fingerprint = get_data_hash([(pkgutil.get_data(__name__, file) or b"").decode("utf-8", "replace") for file in ["Rules.py", "hooks/Rules.py"]])
+
+# the calls of static functions in the requires of the data, found the first time they are needed
+static_function_calls: Optional[list[FunctionRequire]] = None
+
+def get_static_function_calls(world: "ManualWorld") -> list[FunctionRequire]:
+    """Return every call of a static function in the requires strings of the locations and regions, including those in the args of other calls."""
+    global static_function_calls
+
+    if static_function_calls is None:
+        requires_list = [location.get("requires") for location in world.location_table]
+        for region in regionMap.values():
+            requires_list.append(region.get("requires"))
+            requires_list.extend(region.get("entrance_requires", {}).values())
+            requires_list.extend(region.get("exit_requires", {}).values())
+
+        static_function_calls = []
+        queue = deque(requires for requires in requires_list if isinstance(requires, str))
+        while queue:
+            for function in get_function_requires(queue.popleft()):
+                requires_reads = getattr(find_require_function(function.name), "requires_reads", None)
+                if requires_reads is not None and requires_reads.static:
+                    static_function_calls.append(function)
+                queue.append(function.args)
+
+    return static_function_calls
+
+def get_static_functions_reads(world: "ManualWorld") -> tuple[Optional[set[str]], Optional[set[str]]]:
+    """Return the names of the options and of the items whose counts are read by the static functions called in the requires,
+    each is None if one of the functions can read any option/item count.\n
+    The items are the ones in the args of the calls (like |Item| in {OptOne(|Item|)}) and those in the items/categories of the function."""
+    option_names = set()
+    item_names = set()
+    for function in get_static_function_calls(world):
+        requires_reads = find_require_function(function.name).requires_reads
+        if option_names is not None:
+            if requires_reads.options is None:
+                option_names = None
+            else:
+                option_names.update(requires_reads.options(world, function.args) if callable(requires_reads.options) else requires_reads.options)
+
+        if item_names is not None:
+            if requires_reads.any_item:
+                item_names = None
+                continue
+
+            categories = set(requires_reads.categories(world, function.args) if callable(requires_reads.categories) else requires_reads.categories)
+            item_names.update(requires_reads.items(world, function.args) if callable(requires_reads.items) else requires_reads.items)
+            for item in get_item_requires(function.args):
+                (categories if item.category else item_names).add(item.name)
+            for category in categories:
+                item_names.update(world.item_name_groups.get(category, []))
+
+    return option_names, item_names
+
+def get_compiled_requires_key(world: "ManualWorld") -> tuple[str, ...]:
+    """Return what the compiled requires of a world depend on: the data, and when the requires call static functions,
+    the player's options and counts of progression items those functions read, which is all they are allowed to read."""
+    if not get_static_function_calls(world):
+        return (data_fingerprint,)
+
+    option_names, item_names = get_static_functions_reads(world)
+    if option_names is None:
+        options = {option_name: option.value for option_name, option in vars(world.options).items()}
+    else:
+        options = {option_name: getattr(getattr(world.options, option_name, None), "value", None) for option_name in option_names}
+
+    items_counts = world.get_item_counts(world.player, only_progression=True)
+    if item_names is not None:
+        items_counts = {item_name: items_counts.get(item_name, 0) for item_name in item_names}
+
+    return data_fingerprint, get_data_hash(options), get_data_hash(dict(items_counts))
+
+def reset_compiled_requires_cache():
+    """Forget the compiled requires of the previous generation, at the start of a new one."""
+    compiled_requires_cache.clear()
+
+def get_compiled_requires_file(world: "ManualWorld", key: tuple[str, ...]) -> str:
+    return cache_path("manual", format_to_valid_identifier(world.game), f"requires_{get_data_hash([functions_fingerprint, *key])}.json")
+
+def get_compiled_requires(world: "ManualWorld") -> CompiledRequires:
+    key = get_compiled_requires_key(world)
+
+    if key not in compiled_requires_cache:
+        compiled_requires_cache[key] = load_compiled_requires(get_compiled_requires_file(world, key))
+
+    return compiled_requires_cache[key]
+
+# how many compiled requires files are kept per game, the ones used the longest ago are removed first
+compiled_requires_file_limit = 16
+
+def evict_compiled_requires_files(directory: str):
+    """Remove the compiled requires files used the longest ago when there are more than compiled_requires_file_limit,
+    and temporary files left by a crash."""
+    try:
+        entries = [entry for entry in os.scandir(directory) if entry.is_file()]
+        requires_entries = sorted((entry for entry in entries if entry.name.startswith("requires_") and entry.name.endswith(".json")),
+                                  key=lambda entry: entry.stat().st_mtime, reverse=True)
+        old_entries = requires_entries[compiled_requires_file_limit:]
+        old_entries.extend(entry for entry in entries if entry.name.endswith(".tmp") and time.time() - entry.stat().st_mtime > 24 * 60 * 60)
+
+        for entry in old_entries:
+            os.remove(entry.path)
+    except OSError as e:
+        logging.debug(f"Could not clean up the compiled requires cache directory {directory}: {e}")
+
+def load_compiled_requires(path: str) -> CompiledRequires:
+    """Load the expanded trees saved by a previous generation with the same data, functions and options, if there are any."""
+    compiled_requires = CompiledRequires(path)
 
     try:
-        for c in expr:
-            if c.isnumeric():
-                postfix += c
-            elif c in prec:
-                while stack and stack[-1] != "(" and prec[c] <= prec[stack[-1]]:
-                    postfix += stack.pop()
-                stack.append(c)
-            elif c == "(":
-                stack.append(c)
-            elif c == ")":
-                while stack and stack[-1] != "(":
-                    postfix += stack.pop()
-                stack.pop()
-
-        while stack:
-            postfix += stack.pop()
-    except Exception:
-        raise construct_logic_error(location, LogicErrorSource.INFIX_TO_POSTFIX)
-
-    return postfix
-
-
-def evaluate_postfix(expr: str, location: str) -> bool:
-    stack = []
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+
+        if data.get("version") == compiled_requires_file_version:
+            compiled_requires.expanded_trees = {requires: tree_from_json(tree) for requires, tree in data["trees"].items()}
+            compiled_requires.saved_tree_count = len(compiled_requires.expanded_trees)
+            # the modification time is when the file was last used, for the eviction
+            os.utime(path)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+        logging.debug(f"Ignoring the invalid compiled requires cache file {path}: {e}")
+
+    return compiled_requires
+
+def save_compiled_requires(compiled_requires: CompiledRequires):
+    """Save the expanded trees if new ones were compiled since the cache file was loaded/saved."""
+    if compiled_requires.path is None or len(compiled_requires.expanded_trees) <= compiled_requires.saved_tree_count:
+        return
+
+    path = compiled_requires.path
+
+    data = {
+        "version": compiled_requires_file_version,
+        "trees": {requires: tree_to_json(tree) for requires, tree in compiled_requires.expanded_trees.items()}
+    }
 
     try:
-        for c in expr:
-            if c == "0":
-                stack.append(False)
-            elif c == "1":
-                stack.append(True)
-            elif c == "&":
-                op2 = stack.pop()
-                op1 = stack.pop()
-                stack.append(op1 and op2)
-            elif c == "|":
-                op2 = stack.pop()
-                op1 = stack.pop()
-                stack.append(op1 or op2)
-            elif c == "!":
-                op = stack.pop()
-                stack.append(not op)
-    except Exception:
-        raise construct_logic_error(location, LogicErrorSource.EVALUATE_POSTFIX)
-
-    if len(stack) != 1:
-        raise construct_logic_error(location, LogicErrorSource.EVALUATE_STACK_SIZE)
-
-    return stack.pop()
+        # written next to the file then moved over it, so that another generation never reads it half written
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(temporary_path, path)
+        compiled_requires.saved_tree_count = len(compiled_requires.expanded_trees)
+    except OSError as e:
+        logging.debug(f"Could not save the compiled requires cache file {path}: {e}")
+
+    evict_compiled_requires_files(os.path.dirname(path))
 
 def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
     # this is only called when the area (think, location or region) has a "requires" field that is a string
-    def checkRequireStringForArea(state: CollectionState, area: dict):
-        requires_list = area["requires"]
+    def checkRequireStringForArea(state: CollectionState, area: AreaContext):
+        try:
+            requires_tree = getExpandedRequiresTree(area)
+        except RequiresSyntaxError as e:
+            raise construct_logic_error(area, e.source) from e
 
         # Get the "real" item counts of item in the pool/placed/starting_items
         items_counts = world.get_item_counts(player, only_progression=True)
 
-        # Preparing some variables for exception messages
-        area_type = "region" if area.get("is_region",False) else "location"
-        area_name = area.get("name", f"unknown with these parameters: {area}")
+        return evaluateRequiresTree(state, area, requires_tree, items_counts, area.requires)
 
-        if requires_list == "":
-            return True
+    compiled_requires = get_compiled_requires(world)
 
-        def findAndRecursivelyExecuteFunctions(requires_list: str, recursionDepth: int = 0) -> str:
-            found_functions = re.findall(r'\{(\w+)\((.*?)\)\}', requires_list)
-            if found_functions:
-                if recursionDepth > world.rules_functions_maximum_recursion:
-                    raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {world.rules_functions_maximum_recursion}) \
-                                         \n    As of this Exception the following function(s) are waiting to run: {[f[0] for f in found_functions]} \
-                                         \n    And the currently processed requires look like this: "{requires_list}"')
-                else:
-                    for item in found_functions:
-                        func_name = item[0]
-                        func_args = item[1].split(",")
-                        if func_args == ['']:
-                            func_args.pop()
+    # static functions don't depend on the state, so their calls are replaced by their result once, the first time a requires is used
+    expanded_trees = compiled_requires.expanded_trees
 
-                        func = globals().get(func_name)
+    def getExpandedRequiresTree(area: AreaContext) -> RequireNode:
+        requires_tree = expanded_trees.get(area.requires)
 
-                        if func is None:
-                            func = getattr(Rules, func_name, None)
+        if requires_tree is None:
+            requires_tree = expandStaticFunctions(area, parse(area.requires))
+            expanded_trees[area.requires] = requires_tree
 
-                        if not callable(func):
-                            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
+        return requires_tree
 
-                        convert_req_function_args(state, func, func_args, area_name)
-                        try:
-                            result = func(*func_args)
-                        except Exception as ex:
-                            raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
-                                                \nUnless it was called by another function, it should look something like "{{{func_name}({item[1]})}}" in {area_type}s.json. \
-                                                \nFull error message: \
-                                                \n\n{type(ex).__name__}: {ex}')
-                        if isinstance(result, bool):
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "1" if result else "0")
-                        else:
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", str(result))
+    def expandStaticFunctions(area: AreaContext, node: RequireNode, recursionDepth: int = 0) -> RequireNode:
+        if isinstance(node, (AndRequire, OrRequire)):
+            return type(node)(tuple(expandStaticFunctions(area, child, recursionDepth) for child in node.children))
+        elif isinstance(node, NotRequire):
+            return NotRequire(expandStaticFunctions(area, node.child, recursionDepth))
+        elif not isinstance(node, FunctionRequire):
+            return node
 
-                requires_list = findAndRecursivelyExecuteFunctions(requires_list, recursionDepth + 1)
-            return requires_list
+        requires_reads = getattr(find_require_function(node.name), "requires_reads", None)
+        if requires_reads is None or not requires_reads.static:
+            return node
 
-        requires_list = findAndRecursivelyExecuteFunctions(requires_list)
+        if recursionDepth > world.rules_functions_maximum_recursion:
+            raise RecursionError(f'One or more functions in {area.type} "{area.name}"\'s requires looped too many time (maximum recursion is {world.rules_functions_maximum_recursion}) \
+                                 \n    As of this Exception the following function(s) are waiting to run: {[node.name]}')
 
-        # parse user written statement into list of each item
-        for item in re.findall(r'\|[^|]+\|', requires_list):
-            require_type = 'item'
+        result = executeRequireFunction(None, area.type, area.name, node)
+        if isinstance(result, bool):
+            return ConstantRequire(result)
 
-            if '|@' in item:
-                require_type = 'category'
+        # the requires returned by the function takes the place of the call in the tree
+        return expandStaticFunctions(area, parse_requires_for_area(str(result), area), recursionDepth + 1)
 
-            item_base = item
-            item = item.lstrip('|@$').rstrip('|')
+    def evaluateRequiresTree(state: CollectionState, area: AreaContext, node: RequireNode, items_counts: dict, requires: str, recursionDepth: int = 0) -> bool:
+        if isinstance(node, AndRequire):
+            return all(evaluateRequiresTree(state, area, child, items_counts, requires, recursionDepth) for child in node.children)
+        elif isinstance(node, OrRequire):
+            return any(evaluateRequiresTree(state, area, child, items_counts, requires, recursionDepth) for child in node.children)
+        elif isinstance(node, NotRequire):
+            return not evaluateRequiresTree(state, area, node.child, items_counts, requires, recursionDepth)
+        elif isinstance(node, ConstantRequire):
+            return node.value
+        elif isinstance(node, ItemRequire):
+            return checkItemRequire(state, area, node, items_counts)
 
-            item_parts = item.split(":")  # type: list[str]
-            item_name = item
-            item_count = "1"
+        if recursionDepth > world.rules_functions_maximum_recursion:
+            raise RecursionError(f'One or more functions in {area.type} "{area.name}"\'s requires looped too many time (maximum recursion is {world.rules_functions_maximum_recursion}) \
+                                 \n    As of this Exception the following function(s) are waiting to run: {[node.name]} \
+                                 \n    And the currently processed requires look like this: "{requires}"')
 
+        result = executeRequireFunction(state, area.type, area.name, node)
+        if isinstance(result, bool):
+            return result
 
-            if len(item_parts) > 1:
-                item_name = item_parts[0].strip()
-                item_count = item_parts[1].strip()
+        # the function returned a new requires, like OptAll does, which gets evaluated in place of the function
+        result = str(result)
+        return evaluateRequiresTree(state, area, parse_requires_for_area(result, area), items_counts, result, recursionDepth + 1)
 
-            total = 0
+    def executeRequireFunction(state: Optional[CollectionState], area_type: str, area_name: str, function: FunctionRequire):
+        func_name = function.name
+        func_args = function.args.split(",")
+        if func_args == ['']:
+            func_args.pop()
 
-            if require_type == 'category':
-                category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-                category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
-                if item_count.lower() == 'all':
-                    item_count = category_items_counts
-                elif item_count.lower() == 'half':
-                    item_count = int(category_items_counts / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(category_items_counts * percent)
-                else:
-                    try:
-                        item_count = int(item_count)
-                    except ValueError as e:
-                        raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
-
-                for category_item in category_items:
-                    total += state.count(category_item["name"], player)
-
-                    if total >= item_count:
-                        requires_list = requires_list.replace(item_base, "1")
-            elif require_type == 'item':
-                item_current_count = items_counts.get(item_name, 0)
-                if item_count.lower() == 'all':
-                    item_count = item_current_count
-                elif item_count.lower() == 'half':
-                    item_count = int(item_current_count / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(item_current_count * percent)
-                else:
+        func = find_require_function(func_name)
+
+        if not callable(func):
+            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
+
+        convert_req_function_args(world, state, func, func_args, area_name)
+        try:
+            return func(*func_args)
+        except Exception as ex:
+            raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
+                                \nUnless it was called by another function, it should look something like "{{{func_name}({function.args})}}" in {area_type}s.json. \
+                                \nFull error message: \
+                                \n\n{type(ex).__name__}: {ex}')
+
+    def checkItemRequire(state: CollectionState, area: AreaContext, item: ItemRequire, items_counts: dict) -> bool:
+        item_name = item.name
+        item_count = item.count
+
+        if item.category:
+            category_items = world.item_name_groups.get(item_name, [])
+            category_items_counts = sum([items_counts.get(category_item, 0) for category_item in category_items])
+            if item_count.lower() == 'all':
+                item_count = category_items_counts
+            elif item_count.lower() == 'half':
+                item_count = int(category_items_counts / 2)
+            elif item_count.endswith('%') and len(item_count) > 1:
+                percent = clamp(float(item_count[:-1]) / 100, 0, 1)
+                item_count = math.ceil(category_items_counts * percent)
+            else:
+                try:
                     item_count = int(item_count)
+                except ValueError as e:
+                    raise ValueError(f"Invalid item count `{item_name}` in {area.type} '{area.name}'.") from e
 
-                total = state.count(item_name, player)
+            total = 0
+            for category_item in category_items:
+                total += state.count(category_item, player)
 
                 if total >= item_count:
-                    requires_list = requires_list.replace(item_base, "1")
+                    return True
+            return False
+
+        item_current_count = items_counts.get(item_name, 0)
+        if item_count.lower() == 'all':
+            item_count = item_current_count
+        elif item_count.lower() == 'half':
+            item_count = int(item_current_count / 2)
+        elif item_count.endswith('%') and len(item_count) > 1:
+            percent = clamp(float(item_count[:-1]) / 100, 0, 1)
+            item_count = math.ceil(item_current_count * percent)
+        else:
+            item_count = int(item_count)
+
+        return state.count(item_name, player) >= item_count
 
-            if total <= item_count:
-                requires_list = requires_list.replace(item_base, "0")
+    # this is only called when the area (think, location or region) has a "requires" field that is a dict
+    def checkRequireDictForArea(state: CollectionState, area: AreaContext):
+        return checkDictRequires(state, normalize_dict_requires(area.requires))
 
-        requires_list = re.sub(r'\s?\bAND\b\s?', '&', requires_list, 0, re.IGNORECASE)
-        requires_list = re.sub(r'\s?\bOR\b\s?', '|', requires_list, 0, re.IGNORECASE)
+    def checkDictRequires(state: CollectionState, requires: DictRequires) -> bool:
+        for or_items in requires.or_groups:
+            if all(state.has(item_name, player, item_count) for item_name, item_count in or_items):
+                return True
 
-        requires_string = infix_to_postfix("".join(requires_list), area)
-        return (evaluate_postfix(requires_string, area))
+        return all(state.has(item_name, player, item_count) for item_name, item_count in requires.items)
 
-    # this is only called when the area (think, location or region) has a "requires" field that is a dict
-    def checkRequireDictForArea(state: CollectionState, area: dict):
-        canAccess = True
+    # handle any type of checking needed, then ferry the check off to a dedicated method for that check
+    def fullLocationOrRegionCheck(state: CollectionState, area: AreaContext):
+        # don't require the "requires" key for locations and regions if they don't need to use it
+        if area.requires is None:
+            return True
 
-        for item in area["requires"]:
-            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-            if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                canAccessOr = True
-                or_items = item
+        if isinstance(area.requires, str):
+            return checkRequireStringForArea(state, area)
+        else:  # item access is in dict form
+            return checkRequireDictForArea(state, area)
 
-                if isinstance(item, dict):
-                    or_items = item["or"]
+    # requires that only check fixed counts of items and categories are turned into direct state.has() rules,
+    # anything with functions or counts that depend on the pool (all, half, %) goes through fullLocationOrRegionCheck
+    def lowerRequiresTree(node: RequireNode) -> Optional[Callable[[CollectionState, int], bool]]:
+        if isinstance(node, ConstantRequire):
+            return (lambda state, player: True) if node.value else (lambda state, player: False)
+
+        elif isinstance(node, ItemRequire):
+            if not node.count.isdigit():
+                return None
+
+            count = int(node.count)
+            if not node.category:
+                return lambda state, player, name=node.name: state.has(name, player, count)
+            if count < 1:
+                return None # 0 of a category is only true if the category has items, leave that to the evaluator
+            if not world.item_name_groups.get(node.name):
+                return lambda state, player: False
+            return lambda state, player, name=node.name: state.has_group(name, player, count)
+
+        elif isinstance(node, NotRequire):
+            child_rule = lowerRequiresTree(node.child)
+            if child_rule is None:
+                return None
+            return lambda state, player: not child_rule(state, player)
+
+        elif isinstance(node, (AndRequire, OrRequire)):
+            is_and = isinstance(node, AndRequire)
+            item_counts: dict[str, int] = {}
+            rules = []
+
+            for child in node.children:
+                if isinstance(child, ItemRequire) and not child.category and child.count.isdigit():
+                    count = int(child.count)
+                    if child.name in item_counts:
+                        count = max(count, item_counts[child.name]) if is_and else min(count, item_counts[child.name])
+                    item_counts[child.name] = count
+                    continue
 
-                for or_item in or_items:
-                    or_item_parts = or_item.split(":")
-                    or_item_name = or_item
-                    or_item_count = 1
+                child_rule = lowerRequiresTree(child)
+                if child_rule is None:
+                    return None
+                rules.append(child_rule)
+
+            if item_counts:
+                item_names = tuple(item_counts)
+                only_ones = all(count == 1 for count in item_counts.values())
+
+                if is_and and only_ones:
+                    rules.insert(0, lambda state, player: state.has_all(item_names, player))
+                elif is_and:
+                    rules.insert(0, lambda state, player: state.has_all_counts(item_counts, player))
+                elif only_ones:
+                    rules.insert(0, lambda state, player: state.has_any(item_names, player))
+                else:
+                    rules.insert(0, lambda state, player: any(state.has(name, player, count) for name, count in item_counts.items()))
 
-                    if len(or_item_parts) > 1:
-                        or_item_name = or_item_parts[0]
-                        or_item_count = int(or_item_parts[1])
+            if len(rules) == 1:
+                return rules[0]
+            if is_and:
+                return lambda state, player: all(rule(state, player) for rule in rules)
+            return lambda state, player: any(rule(state, player) for rule in rules)
 
-                    if not state.has(or_item_name, player, or_item_count):
-                        canAccessOr = False
+        return None # functions
 
-                if canAccessOr:
-                    canAccess = True
-                    break
-            else:
-                item_parts = item.split(":")
-                item_name = item
-                item_count = 1
+    def lowerAreaRequires(area: AreaContext) -> Optional[Callable[[CollectionState], bool]]:
+        if area.requires is None:
+            return lambda state: True
+
+        if not isinstance(area.requires, str):
+            # dict form is only split into its items once, here
+            dict_requires = normalize_dict_requires(area.requires)
+            return lambda state: checkDictRequires(state, dict_requires)
 
-                if len(item_parts) > 1:
-                    item_name = item_parts[0]
-                    item_count = int(item_parts[1])
+        if area.requires not in compiled_requires.programs:
+            try:
+                compiled_requires.programs[area.requires] = lowerRequiresTree(getExpandedRequiresTree(area))
+            except RequiresSyntaxError:
+                compiled_requires.programs[area.requires] = None # the general evaluator raises the full error message when the rule is first checked
 
-                if not state.has(item_name, player, item_count):
-                    canAccess = False
+        program = compiled_requires.programs[area.requires]
+        # the same program is shared by every player with the same compiled requires, only the player differs
+        return partial(program, player=player) if program is not None else None
 
-        return canAccess
+    def getAreaRequiresTree(area: AreaContext) -> Optional[RequireNode]:
+        if area.requires is None:
+            return ConstantRequire(True)
 
-    # handle any type of checking needed, then ferry the check off to a dedicated method for that check
-    def fullLocationOrRegionCheck(state: CollectionState, area: dict):
-        # if it's not a usable object of some sort, default to true
-        if not area:
-            return True
+        if not isinstance(area.requires, str):
+            return dict_requires_to_tree(normalize_dict_requires(area.requires))
 
-        # don't require the "requires" key for locations and regions if they don't need to use it
-        if "requires" not in area.keys():
-            return True
+        try:
+            return getExpandedRequiresTree(area)
+        except RequiresSyntaxError:
+            return None
 
-        if isinstance(area["requires"], str):
-            return checkRequireStringForArea(state, area)
-        else:  # item access is in dict form
-            return checkRequireDictForArea(state, area)
+    def compileAreaRule(area: AreaContext) -> Callable[[CollectionState], bool]:
+        """Return the access rule for the requires of a location/region, lowered to direct state.has() checks when possible"""
+        return lowerAreaRequires(area) or (lambda state: fullLocationOrRegionCheck(state, area))
+
+    dependency_index = world.item_dependency_index = ItemDependencyIndex()
+
+    def addDependencies(name: str, is_entrance: bool, *requires_list):
+        items = set()
+        any_item = False
+        for requires in requires_list:
+            requires_items, requires_any_item = get_requires_dependencies(world, requires)
+            items |= requires_items
+            any_item = any_item or requires_any_item
+
+        dependency_index.add(name, is_entrance, items, any_item)
+
+    # the expanded requires of every location alongside the one of its region, for BulkRules
+    location_requires_trees: dict[str, Optional[RequireNode]] = {}
+    world.location_requires_trees = location_requires_trees
 
     used_location_names = []
+    region_contexts: dict[str, AreaContext] = {}
+    region_rules: dict[str, Callable[[CollectionState], bool]] = {}
     # Region access rules
     for region in regionMap.keys():
         used_location_names.extend([l.name for l in multiworld.get_region(region, player).locations])
+        region_contexts[region] = AreaContext("region", region, regionMap[region].get("requires"))
+        region_rules[region] = compileAreaRule(region_contexts[region])
         if region != "Menu":
             for exitRegion in multiworld.get_region(region, player).entrances:
-                def fullRegionCheck(state: CollectionState, region=regionMap[region], region_name=exitRegion.name):
-                    region['name'] = region_name
-                    region['is_region'] = True
-
-                    return fullLocationOrRegionCheck(state, region)
-
-                add_rule(world.get_entrance(exitRegion.name), fullRegionCheck)
+                add_rule(world.get_entrance(exitRegion.name), region_rules[region])
+                addDependencies(exitRegion.name, True, regionMap[region].get("requires"))
             entrance_rules = regionMap[region].get("entrance_requires", {})
             for e in entrance_rules:
                 entrance = world.get_entrance(f'{e}To{region}')
-                add_rule(entrance, lambda state, rule={"requires": entrance_rules[e]}: fullLocationOrRegionCheck(state, rule))
+                add_rule(entrance, compileAreaRule(AreaContext("entrance", entrance.name, entrance_rules[e])))
+                addDependencies(entrance.name, True, entrance_rules[e])
             exit_rules = regionMap[region].get("exit_requires", {})
             for e in exit_rules:
                 exit = world.get_entrance(f'{region}To{e}')
-                add_rule(exit, lambda state, rule={"requires": exit_rules[e]}: fullLocationOrRegionCheck(state, rule))
+                add_rule(exit, compileAreaRule(AreaContext("entrance", exit.name, exit_rules[e])))
+                addDependencies(exit.name, True, exit_rules[e])
 
     # Location access rules
     for location in world.location_table:
@@ -310,84 +781,39 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
 
         locFromWorld = multiworld.get_location(location["name"], player)
 
-        locationRegion = regionMap[location["region"]] if "region" in location else None
-
-        if locationRegion:
-            locationRegion['name'] = location['region']
-            locationRegion['is_region'] = True
+        locationContext = AreaContext("location", location["name"], location.get("requires"))
+        regionContext = region_contexts[location["region"]] if "region" in location else AreaContext("region", "", None)
 
-        if "requires" in location: # Location has requires, check them alongside the region requires
-            def checkBothLocationAndRegion(state: CollectionState, location=location, region=locationRegion):
-                locationCheck = fullLocationOrRegionCheck(state, location)
-                regionCheck = True # default to true unless there's a region with requires
+        addDependencies(location["name"], False, locationContext.requires, regionContext.requires)
 
-                if region:
-                    regionCheck = fullLocationOrRegionCheck(state, region)
+        location_tree = getAreaRequiresTree(locationContext)
+        region_tree = getAreaRequiresTree(regionContext)
+        location_requires_trees[location["name"]] = AndRequire((location_tree, region_tree)) if location_tree is not None and region_tree is not None else None
 
-                return locationCheck and regionCheck
+        if "requires" in location: # Location has requires, check them alongside the region requires
+            def checkBothLocationAndRegion(state: CollectionState, locationRule=compileAreaRule(locationContext), regionRule=region_rules.get(regionContext.name) or compileAreaRule(regionContext)):
+                return locationRule(state) and regionRule(state)
 
             set_rule(locFromWorld, checkBothLocationAndRegion)
         elif "region" in location: # Only region access required, check the location's region's requires
-            def fullRegionCheck(state, region=locationRegion):
-                return fullLocationOrRegionCheck(state, region)
-
-            set_rule(locFromWorld, fullRegionCheck)
+            set_rule(locFromWorld, region_rules[location["region"]])
         else: # No location region and no location requires? It's accessible.
             def allRegionsAccessible(state):
                 return True
 
             set_rule(locFromWorld, allRegionsAccessible)
 
-    # Victory requirement
-    multiworld.completion_condition[player] = lambda state: state.has("__Victory__", player)
-
-    def convert_req_function_args(state: CollectionState, func, args: list[str], areaName: str):
-        parameters = inspect.signature(func).parameters
-        knownParameters = [World, 'ManualWorld', MultiWorld, CollectionState]
-        index = -1
-        for parameter in parameters.values():
-            target_type = parameter.annotation
-            index += 1
-            if target_type in knownParameters:
-                if target_type in [World, 'ManualWorld']:
-                    args.insert(index, world)
-                elif target_type == MultiWorld:
-                    args.insert(index, multiworld)
-                elif target_type == CollectionState:
-                    args.insert(index, state)
-                continue
-            if parameter.name.lower() == "player":
-                args.insert(index, player)
-                continue
-
-            if index < len(args) and args[index] != "":
-                value = args[index].strip()
-            else:
-                if parameter.default is not inspect.Parameter.empty:
-                    if index < len(args):
-                        args[index] = parameter.default
-                    else:
-                        args.insert(index, parameter.default)
-                    continue
-                else:
-                    if parameter.annotation is inspect.Parameter.empty:
-                        raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value for its argument \"{parameter.name}\" but it's missing.")
-                    else:
-                        raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type} for its argument \"{parameter.name}\" but it's missing.")
-
-            if target_type == str or parameter.annotation is inspect.Parameter.empty: #Don't convert since its already a string or if we don't know the type to convert to
-                args[index] = value
-                continue
-
-            try:
-                value = convert_string_to_type(value, target_type)
+    save_compiled_requires(compiled_requires)
 
-            except Exception as e:
-                raise Exception(f"A call of the \"{func.__name__}\" function in \"{areaName}\"'s requirement, asks for a value of type {target_type}\nfor its argument \"{parameter.name}\" but its value \"{value}\" cannot be converted to {target_type} \nOriginal Error:'{e}'")
+    # the rules as set here, those that are added to or replaced later aren't in the item dependency index
+    world.set_rules_access_rules = {entrance.name: entrance.access_rule for region in multiworld.get_regions(player) for entrance in region.exits}
+    world.set_rules_access_rules.update({location.name: location.access_rule for location in multiworld.get_locations(player)})
 
-            args[index] = value
+    # Victory requirement
+    multiworld.completion_condition[player] = lambda state: state.has("__Victory__", player)
 
 
+@requires_function(categories=lambda world, args: [f"has_{args.split(':')[0].lower().strip()}_value"])
 def ItemValue(state: CollectionState, player: int, valueCount: str):
     """When passed a string with this format: 'valueName:int',
     this function will check if the player has collect at least 'int' valueName worth of items\n
@@ -403,6 +829,7 @@ def ItemValue(state: CollectionState, player: int, valueCount: str):
 
 
 # Two useful functions to make require work if an item is disabled instead of making it inaccessible
+@requires_function(static=True, options=())
 def OptOne(world: "ManualWorld", item: str, items_counts: Optional[dict] = None):
     """Check if the passed item (with or without ||) is enabled, then this returns |item:count|
     where count is clamped to the maximum number of said item in the itempool.\n
@@ -413,77 +840,56 @@ def OptOne(world: "ManualWorld", item: str, items_counts: Optional[dict] = None)
     if not items_counts:
         items_counts = world.get_item_counts(only_progression=True)
 
-    require_type = 'item'
+    item_name, item_count, is_category = parse_item(item)
 
-    if '@' in item[:2]:
-        require_type = 'category'
-
-    item = item.lstrip('|@$').rstrip('|')
-
-    item_parts = item.split(":")
-    item_name = item
-    item_count = '1'
-
-    if len(item_parts) > 1:
-        item_name = item_parts[0]
-        item_count = item_parts[1]
-
-    if require_type == 'category':
+    if is_category:
         if item_count.isnumeric():
             #Only loop if we can use the result to clamp
-            category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-            category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
+            category_items_counts = sum([items_counts.get(category_item, 0) for category_item in world.item_name_groups.get(item_name, [])])
             item_count = clamp(int(item_count), 0, category_items_counts)
         return f"|@{item_name}:{item_count}|"
-    elif require_type == 'item':
+    else:
         if item_count.isnumeric():
             item_current_count = items_counts.get(item_name, 0)
             item_count = clamp(int(item_count), 0, item_current_count)
         return f"|{item_name}:{item_count}|"
 
 # OptAll check the passed require string and loop every item to check if they're enabled,
+@requires_function(static=True, options=())
 def OptAll(world: "ManualWorld", requires: str):
     """Check the passed require string and loop every item to check if they're enabled,
     then returns the require string with items counts adjusted using OptOne\n
     eg. requires: "{OptAll(|DisabledItem| and |@CategoryWithModifedCount:10|)} and |other items|"
     become "|DisabledItem:0| and |@CategoryWithModifedCount:2| and |other items|" """
-    requires_list = requires
+    if requires == "":
+        return True
 
     items_counts = world.get_item_counts(only_progression=True)
 
-    functions = {}
-    if requires_list == "":
-        return True
-    for item in re.findall(r'\{(\w+)\(([^)]*)\)\}', requires_list):
-        #so this function doesn't try to get item from other functions, in theory.
-        func_name = item[0]
-        functions[func_name] = item[1]
-        requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "{" + func_name + "(temp)}")
-    # parse user written statement into list of each item
-    for item in re.findall(r'\|[^|]+\|', requires):
-        itemScanned = OptOne(world, item, items_counts)
-        requires_list = requires_list.replace(item, itemScanned)
-
-    for function in functions:
-        requires_list = requires_list.replace("{" + function + "(temp)}", "{" + func_name + "(" + functions[func_name] + ")}")
-    return requires_list
+    # only the items directly in the requires get adjusted, other functions are left untouched
+    return "".join(OptOne(world, token.text, items_counts) if token.type == TokenType.ITEM else token.text
+                   for token in tokenize(requires))
 
 # Rule to expose the can_reach_location core function
+@requires_function(any_item=True)
 def canReachLocation(state: CollectionState, player: int, location: str):
     """Can the player reach the given location?"""
     if state.can_reach_location(location, player):
         return True
     return False
 
+@requires_function(static=True, options=lambda world, args: [args.strip()])
 def YamlEnabled(multiworld: MultiWorld, player: int, param: str) -> bool:
     """Is a yaml option enabled?"""
     return is_option_enabled(multiworld, player, param)
 
+@requires_function(static=True, options=lambda world, args: [args.strip()])
 def YamlDisabled(multiworld: MultiWorld, player: int, param: str) -> bool:
     """Is a yaml option disabled?"""
     return not is_option_enabled(multiworld, player, param)
 
-def YamlCompare(world: "ManualWorld", multiworld: MultiWorld, state: CollectionState, player: int, args: str, skipCache: bool = False) -> bool:
+@requires_function(static=True, options=lambda world, args: [format_to_valid_identifier(re.split("[=!<>]", args.strip().lstrip("!"), maxsplit=1)[0])])
+def YamlCompare(world: "ManualWorld", multiworld: MultiWorld, player: int, args: str, skipCache: bool = False) -> bool:
     """Is a yaml option's value compared using {comparator} to the requested value
     \nFormat it like {YamlCompare(OptionName==value)}
     \nWhere == can be any of the following: ==, !=, >=, <=, <, >
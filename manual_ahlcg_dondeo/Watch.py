@@ -0,0 +1,158 @@
+"""Development watch mode for Manual data files.
+
+Run it from your Archipelago folder with:
+    python -m worlds.<your apworld folder>.Watch
+
+It validates your data once, then watches the data/ folder. Whenever one of the files changes, only that file is
+re-parsed and only the validation checks that read it are run again, so you can keep editing your locations.json
+and see the result almost immediately. Press Ctrl-C to stop.
+"""
+import argparse
+import logging
+import os
+import time
+from typing import Callable, Optional
+
+# the data of the package is loaded by the import of the package itself before this runs,
+# Data.py sees that the watcher is running and leaves the report of its validation errors to it instead of waiting on a prompt
+from .Data import ManualFile, load_list_table
+from .DataValidation import DataValidation, ValidationError, data_load_validations, generation_validations, runDataValidations
+
+from .hooks.Data import \
+    after_load_game_file, \
+    after_load_item_file, after_load_location_file, \
+    after_load_region_file, after_load_category_file, \
+    after_load_option_file, after_load_meta_file
+
+data_folder = os.path.join(os.path.dirname(__file__), "data")
+
+# file name: (table name used by the validations, type of the file's content, hook called after loading it)
+watched_files: dict[str, tuple[str, type, Callable]] = {
+    "game.json": ("game", dict, after_load_game_file),
+    "items.json": ("items", list, after_load_item_file),
+    "items.csv": ("items", list, after_load_item_file),
+    "items.tsv": ("items", list, after_load_item_file),
+    "locations.json": ("locations", list, after_load_location_file),
+    "locations.csv": ("locations", list, after_load_location_file),
+    "locations.tsv": ("locations", list, after_load_location_file),
+    "regions.json": ("regions", dict, after_load_region_file),
+    "categories.json": ("categories", dict, after_load_category_file),
+    "options.json": ("options", dict, after_load_option_file),
+    "meta.json": ("meta", dict, after_load_meta_file),
+}
+
+class DataWatcher:
+    """Keep the DataValidation tables in sync with the data folder and revalidate what changed."""
+    def __init__(self, folder: str = data_folder):
+        self.folder = folder
+        self.modified_times: dict[str, Optional[float]] = {}
+        self.file_items: list = []
+        self.results: dict[Callable[[], None], Optional[ValidationError]] = {}
+
+    def get_modified_time(self, filename: str) -> Optional[float]:
+        try:
+            return os.stat(os.path.join(self.folder, filename)).st_mtime
+        except OSError:
+            return None
+
+    def find_changed_files(self) -> list[str]:
+        changed = []
+        for filename in watched_files:
+            modified_time = self.get_modified_time(filename)
+            if self.modified_times.get(filename, -1) != modified_time:
+                self.modified_times[filename] = modified_time
+                changed.append(filename)
+        return changed
+
+    def load_file(self, filename: str) -> set[str]:
+        """Re-parse a single data file into its DataValidation table and return the tables that changed."""
+        table_name, data_type, hook = watched_files[filename]
+
+        if table_name in ["items", "locations"]:
+            # items and locations can be split between json and csv/tsv files, which together make the table
+            contents = load_list_table(table_name)
+        else:
+            contents = ManualFile(filename, data_type).load()
+
+        if isinstance(contents, dict):
+            contents.pop('$schema', '')
+
+        contents = hook(contents)
+
+        if table_name == "game":
+            DataValidation.game_table = contents
+            # the filler item is added to the items from the game settings, so those need a refresh too
+            self.add_filler_item()
+            return {"game", "items"}
+        elif table_name == "items":
+            self.file_items = contents
+            self.add_filler_item()
+        elif table_name == "locations":
+            DataValidation.location_table = contents
+        elif table_name == "regions":
+            DataValidation.region_table = contents
+
+        return {table_name}
+
+    def add_filler_item(self):
+        # mirror Items.py, which adds the filler item to the list of items for lookup
+        filler_item_name = DataValidation.game_table.get("filler_item_name", "Filler")
+        DataValidation.item_table = self.file_items + ([{"name": filler_item_name}] if filler_item_name else [])
+
+    def revalidate(self, changed_files: list[str]) -> float:
+        """Reload the changed files, rerun the affected validations and return how long it took."""
+        start = time.perf_counter()
+
+        changed_tables = set()
+        loaded_tables = set()
+        for filename in changed_files:
+            if watched_files[filename][0] in loaded_tables:
+                continue # the other file of the same table changed too, and the whole table was already reloaded
+            loaded_tables.add(watched_files[filename][0])
+            changed_tables |= self.load_file(filename)
+
+        if "items" in changed_tables:
+            DataValidation.buildItemLookups()
+        if "regions" in changed_tables:
+            DataValidation.buildRegionLookups()
+
+        self.results.update(runDataValidations(data_load_validations, changed_tables))
+        self.results.update(runDataValidations(generation_validations, changed_tables))
+
+        return time.perf_counter() - start
+
+    def report(self, changed_files: list[str], duration: float):
+        errors = [e for e in self.results.values() if e is not None]
+        logging.info(f"Revalidated {', '.join(changed_files)} in {duration * 1000:.0f}ms")
+
+        if errors:
+            logging.error("\nValidationError(s): \n\n%s\n\n" % ("\n".join([' - ' + str(validation_error) for validation_error in errors])))
+        else:
+            logging.info("No validation errors.")
+
+    def run(self, interval: float = 0.2):
+        # the first pass loads every file, so everything gets validated once
+        changed_files = self.find_changed_files()
+        self.report(changed_files, self.revalidate(changed_files))
+
+        while True:
+            time.sleep(interval)
+            changed_files = self.find_changed_files()
+            if changed_files:
+                self.report(changed_files, self.revalidate(changed_files))
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch the data folder of this Manual and revalidate it on every change.")
+    parser.add_argument("--interval", type=float, default=0.2, help="How often, in seconds, to check the data files for changes.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.info(f"Watching {data_folder}, press Ctrl-C to stop.")
+
+    try:
+        DataWatcher().run(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
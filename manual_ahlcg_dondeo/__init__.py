@@ -1,7 +1,8 @@
-from base64 import b64encode
 import logging
 import os
-import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional, Counter
 import webbrowser
 
@@ -9,18 +10,18 @@ import Utils
 from worlds.generic.Rules import forbid_items_for_player
 from worlds.LauncherComponents import Component, SuffixIdentifier, components, Type, launch_subprocess, icon_paths
 
-from .Data import item_table, location_table, region_table, category_table
+from .Data import item_table, location_table, category_table
 from .Game import game_name, filler_item_name, starting_items
-from .Meta import world_description, world_webworld, enable_region_diagram
-from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
-from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
+from .Meta import world_description, world_webworld, enable_region_diagram, shared_output_data
+from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, location_hint_entrances, victory_names
+from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups, item_value_deltas
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
 
 from .Regions import create_regions
 from .Items import ManualItem
-from .Rules import set_rules
+from .Rules import set_rules, reset_compiled_requires_cache
 from .Options import manual_options_data
-from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat
+from .Helpers import is_item_enabled, get_option_value, get_items_for_player, reset_item_value_cache_for_player, resolve_yaml_option, is_pass_through_hook
 
 from BaseClasses import CollectionState, ItemClassification, Item
 from Options import PerGameCommonOptions
@@ -36,6 +37,14 @@ from .hooks.World import \
     before_extend_hint_information, after_extend_hint_information, \
     after_collect_item, after_remove_item
 from .hooks.Data import hook_interpret_slot_data
+from .ManualFile import encode_apmanual, write_shared_apmanual_data
+from .RegionDiagram import snapshot_regions, get_region_diagram_hash, render_region_diagram
+
+# when both item creation hooks are left as is, items can be created in bulk without calling them for every item
+create_item_hooks_pass_through = is_pass_through_hook(before_create_item) and is_pass_through_hook(after_create_item)
+
+# a single worker renders the region diagrams, so players with the same regions never render the same diagram twice at once
+region_diagram_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ManualRegionDiagram") if enable_region_diagram else None
 
 class ManualWorld(World):
     __doc__ = world_description
@@ -55,6 +64,7 @@ class ManualWorld(World):
     item_name_to_id = item_name_to_id
     item_name_to_item = item_name_to_item
     item_name_groups = item_name_groups
+    item_value_deltas = item_value_deltas
 
     filler_item_name = filler_item_name
 
@@ -62,10 +72,15 @@ class ManualWorld(World):
     item_counts_progression: dict[int, Counter[str]] = {}
     start_inventory = {}
 
+    # the reference to the shared data file of each (game, seed), only the first player's generate_output builds and writes it
+    shared_output_references: dict[tuple[str, int], dict[str, str]] = {}
+    shared_output_lock = threading.Lock()
+
     location_id_to_name = location_id_to_name
     location_name_to_id = location_name_to_id
     location_name_to_location = location_name_to_location
     location_name_groups = location_name_groups
+    location_hint_entrances = location_hint_entrances
     victory_names = victory_names
 
     # UT (the universal-est of trackers) can now generate without a YAML
@@ -91,6 +106,7 @@ class ManualWorld(World):
     @classmethod
     def stage_assert_generate(cls, multiworld) -> None:
         runGenerationDataValidation(cls)
+        reset_compiled_requires_cache()
 
 
     def create_regions(self):
@@ -121,12 +137,12 @@ class ManualWorld(World):
             if name == filler_item_name: continue # intentionally using the Game.py filler_item_name here because it's a non-Items item
 
             item = self.item_name_to_item[name]
-            item_count = int(item.get("count", 1))
+            item_count = int(item.count if item.count is not None else 1)
 
-            if item.get("trap"):
+            if item.trap:
                 traps.append(name)
 
-            if "category" in item:
+            if item.category is not None:
                 if not is_item_enabled(self.multiworld, self.player, item):
                     item_count = 0
 
@@ -138,9 +154,7 @@ class ManualWorld(World):
             total_created = 0
             if type(configs) is int:
                 total_created = configs
-                for _ in range(configs):
-                    new_item = self.create_item(name)
-                    pool.append(new_item)
+                pool.extend(self.create_items_batch(name, configs))
             elif type(configs) is dict:
                 for cat, count in configs.items():
                     total_created += count
@@ -157,9 +171,7 @@ class ManualWorld(World):
                         except Exception as ex:
                             raise Exception(f"Item override '{cat}' for {name} improperly defined\n\n{type(ex).__name__}:{ex}")
 
-                    for _ in range(count):
-                        new_item = self.create_item(name, true_class)
-                        pool.append(new_item)
+                    pool.extend(self.create_items_batch(name, count, true_class))
             else:
                 raise Exception(f"Item override for {name} improperly defined")
 
@@ -216,7 +228,7 @@ class ManualWorld(World):
 
                 # if the setting lists specific item categories, limit the items to ones that have any of those categories
                 if "item_categories" in starting_item_block:
-                    items_in_categories = [item["name"] for item in self.item_name_to_item.values() if "category" in item and len(set(starting_item_block["item_categories"]).intersection(item["category"])) > 0]
+                    items_in_categories = [item.name for item in self.item_name_to_item.values() if item.category and len(set(starting_item_block["item_categories"]).intersection(item.category)) > 0]
                     items = [item for item in pool if item.name in items_in_categories]
 
                 self.random.shuffle(items)
@@ -243,50 +255,82 @@ class ManualWorld(World):
         real_pool = pool + items_started
         self.item_counts[self.player] = self.get_item_counts(pool=real_pool)
         self.item_counts_progression[self.player] = self.get_item_counts(pool=real_pool, only_progression=True)
+        reset_item_value_cache_for_player(self)
 
     def create_item(self, name: str, class_override: Optional['ItemClassification']=None) -> Item:
         name = before_create_item(name, self, self.multiworld, self.player)
 
-        item = self.item_name_to_item[name]
         if class_override is not None:
             classification = class_override
         else:
+            classification = self.get_item_classification(name)
+
+        item_object = ManualItem(name, classification,
+                        self.item_name_to_id[name], player=self.player)
+
+        item_object = after_create_item(item_object, self, self.multiworld, self.player)
+
+        return item_object
+
+    def create_items_batch(self, name: str, count: int, class_override: Optional['ItemClassification']=None) -> list[Item]:
+        """Create count copies of an item, the same as calling create_item that many times.\n
+        If the before_create_item and after_create_item hooks aren't changed from the template, the items are made directly
+        without going through the hooks for each one."""
+        if not create_item_hooks_pass_through:
+            return [self.create_item(name, class_override) for _ in range(count)]
+
+        if class_override is not None:
+            classification = class_override
+        else:
+            classification = self.get_item_classification(name)
+
+        item_id = self.item_name_to_id[name]
+        return [ManualItem(name, classification, item_id, player=self.player) for _ in range(count)]
+
+    def get_item_classification(self, name: str) -> ItemClassification:
+        """Return the classification of an item from its trap/useful/progression properties, cached per item name."""
+        if not hasattr(self, 'item_classifications'):
+            self.item_classifications = {}
+
+        classification = self.item_classifications.get(name)
+        if classification is None:
+            item = self.item_name_to_item[name]
             classification = ItemClassification.filler
 
-            if "trap" in item and item["trap"]:
+            if item.trap:
                 classification |= ItemClassification.trap
 
-            if "useful" in item and item["useful"]:
+            if item.useful:
                 classification |= ItemClassification.useful
 
-            if "progression_skip_balancing" in item and item["progression_skip_balancing"]:
+            if item.progression_skip_balancing:
                 classification |= ItemClassification.progression_skip_balancing
-            elif "progression" in item and item["progression"]:
+            elif item.progression:
                 classification |= ItemClassification.progression
 
-        item_object = ManualItem(name, classification,
-                        self.item_name_to_id[name], player=self.player)
-
-        item_object = after_create_item(item_object, self, self.multiworld, self.player)
-
-        return item_object
+            self.item_classifications[name] = classification
+        return classification
 
     # Item Value need a tweaked collect and remove:
     def collect(self, state: CollectionState, item: Item) -> bool:
         change = super().collect(state, item)
-        manual_item = self.item_name_to_item.get(item.name, {})
-        if change and manual_item.get("value"):
-            for key, value in manual_item["value"].items():
-                state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] += int(value)
+        if change:
+            value_deltas = self.item_value_deltas.get(item.name)
+            if value_deltas:
+                prog_items = state.prog_items[item.player]
+                for key, delta in value_deltas:
+                    prog_items[key] += delta
         after_collect_item(self, state, change, item)
         return change
 
     def remove(self, state: CollectionState, item: Item) -> bool:
         change = super().remove(state, item)
-        manual_item = self.item_name_to_item.get(item.name, {})
-        if change and manual_item.get("value"):
-            for key, value in manual_item["value"].items():
-                state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] -= int(value)
+        if change:
+            value_deltas = self.item_value_deltas.get(item.name)
+            if value_deltas:
+                prog_items = state.prog_items[item.player]
+                for key, delta in value_deltas:
+                    prog_items[key] -= delta
         after_remove_item(self, state, change, item)
         return change
 
@@ -301,23 +345,23 @@ class ManualWorld(World):
         before_generate_basic(self, self.multiworld, self.player)
 
         # Handle item forbidding
-        manual_locations_with_forbid = {location['name']: location for location in location_name_to_location.values() if "dont_place_item" in location or "dont_place_item_category" in location}
+        manual_locations_with_forbid = {location.name: location for location in location_name_to_location.values() if location.dont_place_item is not None or location.dont_place_item_category is not None}
         locations_with_forbid = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_forbid.keys()]
         for location in locations_with_forbid:
             manual_location = manual_locations_with_forbid[location.name]
             forbidden_item_names = []
 
-            if manual_location.get("dont_place_item"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if i["name"] in manual_location["dont_place_item"]])
+            if manual_location.dont_place_item:
+                forbidden_item_names.extend([i.name for i in item_name_to_item.values() if i.name in manual_location.dont_place_item])
 
-            if manual_location.get("dont_place_item_category"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])])
+            if manual_location.dont_place_item_category:
+                forbidden_item_names.extend([i.name for i in item_name_to_item.values() if i.category and set(i.category).intersection(manual_location.dont_place_item_category)])
 
             if forbidden_item_names:
                 forbid_items_for_player(location, set(forbidden_item_names), self.player)
 
         # Handle specific item placements using fill_restrictive
-        manual_locations_with_placements = {location['name']: location for location in location_name_to_location.values() if "place_item" in location or "place_item_category" in location}
+        manual_locations_with_placements = {location.name: location for location in location_name_to_location.values() if location.place_item is not None or location.place_item_category is not None}
         locations_with_placements = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_placements.keys()]
         for location in locations_with_placements:
             manual_location = manual_locations_with_placements[location.name]
@@ -333,7 +377,7 @@ class ManualWorld(World):
                 place_messages.append('", "'.join(manual_location["place_item"]))
 
             if manual_location.get("place_item_category"):
-                eligible_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["place_item_category"])]
+                eligible_item_names += [i.name for i in item_name_to_item.values() if i.category and set(i.category).intersection(manual_location["place_item_category"])]
                 place_messages.append('", "'.join(manual_location["place_item_category"]) + " category(ies)")
 
             # Second we check for forbidden items names
@@ -342,7 +386,7 @@ class ManualWorld(World):
                 forbid_messages.append('", "'.join(manual_location["dont_place_item"]) + ' items')
 
             if manual_location.get("dont_place_item_category"):
-                forbidden_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])]
+                forbidden_item_names += [i.name for i in item_name_to_item.values() if i.category and set(i.category).intersection(manual_location["dont_place_item_category"])]
                 forbid_messages.append('", "'.join(manual_location["dont_place_item_category"]) + ' category(ies)')
 
             # If we forbid some names, check for those in the possible names and remove them
@@ -367,10 +411,14 @@ class ManualWorld(World):
 
         after_generate_basic(self, self.multiworld, self.player)
 
-        # Enable this in Meta.json to generate a diagram of your manual.  Only works on 0.4.4+
-        if enable_region_diagram:
-            from Utils import visualize_regions
-            visualize_regions(self.multiworld.get_region("Menu", self.player), f"{self.game}_{self.player}.puml")
+        # Enable this in Meta.json to generate a diagram of your manual.
+        # It shows the regions as they are before fill, rendered from a snapshot while fill runs and copied to the output by generate_output.
+        # Diagrams are named after a hash of everything they show, so players with the same diagram share one file
+        # and a diagram that was already rendered by another generation is used again.
+        if region_diagram_executor:
+            snapshot = snapshot_regions(self.multiworld, self.player)
+            self.region_diagram_file = Utils.cache_path("manual", "diagrams", f"{self.game}_{get_region_diagram_hash(snapshot)[:16]}.puml")
+            self.region_diagram = region_diagram_executor.submit(render_region_diagram, snapshot, self.region_diagram_file)
 
     def pre_fill(self):
         # DataValidation after all the hooks are done but before fill
@@ -391,10 +439,35 @@ class ManualWorld(World):
         return slot_data
 
     def generate_output(self, output_directory: str):
+        if hasattr(self, 'region_diagram'):
+            self.region_diagram.result()
+            output_path = os.path.join(output_directory, os.path.basename(self.region_diagram_file))
+            if not os.path.exists(output_path):
+                shutil.copyfile(self.region_diagram_file, output_path)
+
         data = self.client_data()
+        if shared_output_data:
+            data = {
+                **{key: value for key, value in data.items() if key not in ("items", "locations", "categories")},
+                "shared_data": self.get_shared_output_reference(output_directory),
+                "items": list(data["items"]),
+                "locations": list(data["locations"]),
+            }
         filename = f"{self.multiworld.get_out_file_name_base(self.player)}.apmanual"
         with open(os.path.join(output_directory, filename), 'wb') as f:
-            f.write(b64encode(bytes(json.dumps(data), 'utf-8')))
+            f.write(encode_apmanual(data))
+
+    def get_shared_output_reference(self, output_directory: str) -> dict[str, str]:
+        """Return the reference to the shared data file of the seed for the .apmanual file, writing it if it isn't there yet."""
+        key = (self.game, self.multiworld.seed)
+        # generate_output runs in parallel for every player, the others wait for the first one to write the file
+        with self.shared_output_lock:
+            reference = self.shared_output_references.get(key)
+            if reference is None or not os.path.exists(os.path.join(output_directory, reference["file"])):
+                reference = write_shared_apmanual_data(output_directory, self.game, self.shared_client_data())
+                self.shared_output_references[key] = reference
+
+        return reference
 
     def write_spoiler(self, spoiler_handle):
         before_write_spoiler(self, self.multiworld, spoiler_handle)
@@ -402,13 +475,16 @@ class ManualWorld(World):
     def extend_hint_information(self, hint_data: dict[int, dict[int, str]]) -> None:
         before_extend_hint_information(hint_data, self, self.multiworld, self.player)
 
-        for location in self.multiworld.get_locations(self.player):
+        for location_name, hint_entrance in self.location_hint_entrances.items():
+            try:
+                location = self.multiworld.get_location(location_name, self.player)
+            except KeyError: # removed from this player's world
+                continue
             if not location.address:
                 continue
-            if "hint_entrance" in self.location_name_to_location[location.name]:
-                if self.player not in hint_data:
-                    hint_data.update({self.player: {}})
-                hint_data[self.player][location.address] = self.location_name_to_location[location.name]["hint_entrance"]
+            if self.player not in hint_data:
+                hint_data.update({self.player: {}})
+            hint_data[self.player][location.address] = hint_entrance
 
         after_extend_hint_information(hint_data, self, self.multiworld, self.player)
 
@@ -501,17 +577,46 @@ class ManualWorld(World):
 
 
     def client_data(self):
+        """The data written to the player's .apmanual file for the client.\n
+        Only the items of the player's pool, the locations that exist in their world and the properties the client reads are included,
+        the client uses the apworld's own tables for anything else."""
+        items = {}
+        for name in sorted(self.get_item_counts()):
+            item = self.item_name_to_item.get(name)
+            if item is not None:
+                items[name] = self._client_record(item)
+
+        locations = {}
+        for location in self.multiworld.get_locations(self.player):
+            manual_location = self.location_name_to_location.get(location.name)
+            if manual_location is not None:
+                locations[location.name] = self._client_record(manual_location)
+
+        used_categories = {category for data in (*items.values(), *locations.values()) for category in data["category"]}
+
         return {
             "game": self.game,
             'player_name': self.multiworld.get_player_name(self.player),
             'player_id': self.player,
-            'items': self.item_name_to_item,
-            'locations': self.location_name_to_location,
-            # todo: extract connections out of multiworld.get_regions() instead, in case hooks have modified the regions.
-            'regions': region_table,
-            'categories': category_table
+            'items': items,
+            'locations': dict(sorted(locations.items())),
+            'categories': {name: {"hidden": bool(category.get("hidden", False))}
+                           for name, category in category_table.items() if name in used_categories}
         }
 
+    def shared_client_data(self):
+        """The data of every item, location and category of the game in the format of client_data, the same for every player.\n
+        Written once per seed when shared_output_data is enabled in meta.json."""
+        return {
+            'items': {name: self._client_record(item) for name, item in self.item_name_to_item.items()},
+            'locations': {name: self._client_record(location) for name, location in self.location_name_to_location.items()},
+            'categories': {name: {"hidden": bool(category.get("hidden", False))} for name, category in category_table.items()}
+        }
+
+    @staticmethod
+    def _client_record(record) -> dict:
+        return {"name": record.name, "category": list(record.category or [])}
+
 ###
 # Non-world client methods
 ###
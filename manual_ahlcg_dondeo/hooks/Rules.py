@@ -1,10 +1,16 @@
 from typing import Optional
 from worlds.AutoWorld import World
-from ..Helpers import clamp, get_items_with_value, get_option_value
+from ..Helpers import clamp, get_items_with_value, get_option_value, requires_function
 from BaseClasses import CollectionState
 
 import re
 
+# The functions used in requires read the investigators, their actions and slots, and count the cards they can play.
+# GetCardsInvestigatorCanPlay goes through every item of the state but only counts the ones in the Card category,
+# so the item dependency index only needs those categories (plus the card named in the args, when there's one).
+def _card_arg(world: World, args: str) -> list[str]:
+    return [args.split(",")[0].strip()]
+
 def TwoUnlockedInvestigatorsCanPlayTogether(world: World, state: CollectionState, player: int, investigatorsName: tuple[str, str]):
     decks = {}
     decks[investigatorsName[0]] = list(GetCardsInvestigatorCanPlay(world, state, player, investigatorsName[0]))
@@ -30,6 +36,7 @@ def TwoUnlockedInvestigatorsCanPlayTogether(world: World, state: CollectionState
     return len(firstDeck) * 2 + len(secondDeck) * 2 + len(common) * common_adder >= 60
 
 
+@requires_function(categories=["Investigators", "Actions", "Card"])
 def TwoUnlockedInvestigatorsWithActions(world: World, state: CollectionState, player: int, actions1: str, actions2: str):
     investigatorsActions = [actions1, actions2]
     investigatorsName = world.item_name_groups["Investigators"]
@@ -105,11 +112,13 @@ def HasInvestigatorActions(world: World, state: CollectionState, player: int, in
     return True
 
 # For 1 investigator only. If multiple actions required: - Split (Character: +)
+@requires_function(categories=["Investigators", "Actions", "Card"])
 def AnyUnlockedInvestigatorWithActions(world: World, state: CollectionState, player: int, actionStr: str):
     """has the player unlocked an investigator that can do specific actions?"""
     return len(GetUnlockedInvestigatorsWithActions(world, state, player, actionStr, 1)) == 1
 
 
+@requires_function(items=["Lita Chantler"], categories=["Investigators", "Slot", "Card"])
 def AnyUnlockedInvestigatorCanPlayLita(world: World, state: CollectionState, player: int):
     """Has the player unlocked what it takes to play Lita Chantler?"""
     investigators = world.item_name_groups.get("Investigators")
@@ -127,6 +136,7 @@ def AnyUnlockedInvestigatorCanPlayLita(world: World, state: CollectionState, pla
     return False
 
 
+@requires_function(items=_card_arg, categories=["Investigators", "Actions", "Card"])
 def EligibleUnlockedInvestigatorCanPlay(world: World, state: CollectionState, player: int, cardName: str, actions: str = None):
     """Has the player unlocked an investigator that can play specific card?"""
     if not state.has(cardName, player):
@@ -159,6 +169,7 @@ def EligibleUnlockedInvestigatorCanPlay(world: World, state: CollectionState, pl
 
 # Need testing
 firearms = {"Roland Banks": 1, ".45 Automatic": 1, ".41 Derringer": 1, "Shotgun": 2}
+@requires_function(categories=["Investigators", "Slot", "Card"])
 def EligibleUnlockedInvestigatorCanPlaceFirearm(world: World, state: CollectionState, player: int):
     """Has the player unlocked an investigator that can place a firearm?"""
 
@@ -193,6 +204,7 @@ onlyKnowledgeCommits = ["Evidence!", "Extra Ammunition", "Magnifying Glass", "Dr
                         "Magnifying Glass - Level 1", "Deduction", "Burglary", "Leo De Luca", "Sneak Attack",
                         "Leo De Luca - Level 1", "Forbidden Knowledge", "Scrying", "Scavenging", "Look What I Found!",
                         "Flashlight", "Perception"]
+@requires_function(items=_card_arg, categories=["Investigators", "Actions", "Card"])
 def EligibleUnlockedInvestigatorCanCommit(world: World, state: CollectionState, player: int, itemName: str):
     """Has the player unlocked an investigator that can commit specific card?"""
 
@@ -243,6 +255,7 @@ def EligibleUnlockedInvestigatorCanCommit(world: World, state: CollectionState,
     return False
 
 
+@requires_function(categories=["Investigators", "Card"])
 def UnlockedInvestigatorCanPlay(world: World, state: CollectionState, player: int, investigatorName: str):
     """Has the player unlocked enough cards to play as specific investigator?"""
     if not state.has(investigatorName, player):
@@ -250,6 +263,7 @@ def UnlockedInvestigatorCanPlay(world: World, state: CollectionState, player: in
     return len(GetCardsInvestigatorCanPlay(world, state, player, investigatorName, 15)) >= 15
 
 
+@requires_function(categories=["Investigators", "Actions", "Slot", "Card"])
 def AnyUnlockedInvestigatorIsPrepared(world: World, state: CollectionState, player: int):
     """Has the player unlocked an investigator's full potential?"""
     investigators = world.item_name_groups.get("Investigators")